@@ -3,6 +3,7 @@ from openpyxl.styles import Border, Side, Alignment, Font
 import csv
 import math
 import string
+from date_parsing import get_year
 
 
 class Vacancy:
@@ -13,7 +14,7 @@ class Vacancy:
     def __init__(self, row_dict: dict):
         self.__name = row_dict['name']
         self.__area_name = row_dict['area_name']
-        self.__publish_time = int(row_dict['published_at'][:4])
+        self.__publish_time = get_year(row_dict['published_at'])
         self.__salary_from = float(row_dict['salary_from'])
         self.__salary_to = float(row_dict['salary_to'])
         self.__salary_curr = row_dict['salary_currency']
@@ -1,13 +1,24 @@
-from jinja2 import Environment, FileSystemLoader
 import doctest
-import pdfkit
 import numpy as np
-import matplotlib.pyplot as table
 from openpyxl import Workbook
 from openpyxl.styles import Border, Side, Alignment, Font
 import csv
+import copy
 import math
+import os
 import string
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from itertools import repeat
+from csv_shards import read_header, read_shard, split_csv
+from aggregate_snapshot import load_snapshot, save_snapshot
+from profession_matcher import ProfessionMatcher
+from date_parsing import get_year
+from name_index import NameIndex
+from report_pipeline import ReportPipeline
+from report_figure import ReportFigure
+from pdf_backends import get_backend
+from template_registry import get_template
 
 
 class Vacancy:
@@ -22,6 +33,7 @@ class Vacancy:
         __salary_to (float) : Верхняя граница вилки оклада
         __salary_curr (str) : Валюта оклада
         __average_salary (float) : Среднее значение вилки оклада уже в валюте
+        __is_selected (bool | None) : Признак выбранной вакансии, найденный по NameIndex, или None
         currency_to_rub (dict) : Курс валют к рублю
     """
     currency_to_rub = {"AZN": 35.68, "BYR": 23.91, "EUR": 59.90,
@@ -37,11 +49,12 @@ class Vacancy:
         """
         self.__name = row_dict['name']
         self.__area_name = row_dict['area_name']
-        self.__publish_time = int(row_dict['published_at'][:4])
+        self.__publish_time = get_year(row_dict['published_at'])
         self.__salary_from = float(row_dict['salary_from'])
         self.__salary_to = float(row_dict['salary_to'])
         self.__salary_curr = row_dict['salary_currency']
         self.__average_salary = (self.__salary_from + self.__salary_to) / 2 * self.currency_to_rub[self.__salary_curr]
+        self.__is_selected = row_dict.get('is_selected')
 
     @property
     def get_name(self):
@@ -83,6 +96,20 @@ class Vacancy:
         """
         return self.__average_salary
 
+    def is_selected(self, selected_vacancy: str):
+        """
+        Проверяет, что вакансия относится к выбранной. Если признак уже найден по NameIndex, строка не проверяется
+
+        Args:
+            selected_vacancy (str) : Выбранная вакансия
+
+        Returns:
+            bool: Входит ли selected_vacancy в название вакансии
+        """
+        if self.__is_selected is not None:
+            return self.__is_selected
+        return selected_vacancy in self.__name
+
 class Statistic:
     """
     Класс формирующий статистику выбранной вакансии
@@ -211,21 +238,26 @@ class Statistic:
 
     def handle_information(self):
         """
-        Обрабатывает  по ТЗ информацию из файла, для дальнейшей работы
+        Обрабатывает  по ТЗ информацию из файла, для дальнейшей работы. Словари динамики строятся заново,
+        чтобы годы, добавленные merge, встали по порядку
         """
-        for publish_time in self.__publish_times.values():
+        self.__salary_dynamic = dict()
+        self.__vacancies_dynamic = dict()
+        self.__selected_salary_dynamic = dict()
+        self.__selected_vacancies_dynamic = dict()
+        for publish_time in sorted(self.__publish_times.values(), key=lambda x: x.get_name):
             self.__salary_dynamic[publish_time.get_name] = math.floor(publish_time.get_average_salary)
             self.__vacancies_dynamic[publish_time.get_name] = publish_time.get_vacancy_count
             self.__selected_salary_dynamic[publish_time.get_name] = math.floor(publish_time.get_selected_vacancy_average_salary)
             self.__selected_vacancies_dynamic[publish_time.get_name] = publish_time.get_selected_vacancy_count
 
-        self.__cities = dict(filter(lambda x: x[1].get_vacancy_count >= (self.__vacancies_count / 100),
-                                    self.__cities.items()))
-        self.__city_salary_dynamic = dict(sorted(self.__cities.items(),
+        cities = dict(filter(lambda x: x[1].get_vacancy_count >= (self.__vacancies_count / 100),
+                             self.__cities.items()))
+        self.__city_salary_dynamic = dict(sorted(cities.items(),
                                                   key=lambda x: x[1].get_average_salary, reverse=True)[:10])
         self.__city_salary_dynamic = {key: math.floor(value.get_average_salary)
                                        for key, value in self.__city_salary_dynamic.items()}
-        self.__city_vacancies_dynamic = dict(sorted(self.__cities.items(),
+        self.__city_vacancies_dynamic = dict(sorted(cities.items(),
                                                          key=lambda x: x[1].get_vacancy_count, reverse=True)[:10])
         self.__city_vacancies_dynamic = {key: round(value.get_vacancy_count / self.__vacancies_count, 4)
                                               for key, value in self.__city_vacancies_dynamic.items()}
@@ -235,7 +267,15 @@ class Statistic:
         """
         Обновляет количественные значения и время
         """
-        vacancy = Vacancy(row_dict)
+        self.add_vacancy(Vacancy(row_dict))
+
+    def add_vacancy(self, vacancy: Vacancy):
+        """
+        Добавляет вакансию в статистику по городам и годам
+
+        Args:
+            vacancy (Vacancy) : Информация о вакансии
+        """
         if vacancy.get_area_name not in self.__cities.keys():
             self.__cities[vacancy.get_area_name] = City(vacancy)
         else:
@@ -246,6 +286,100 @@ class Statistic:
             self.__publish_times[vacancy.get_publish_time].update(vacancy)
         self.__vacancies_count += 1
 
+    @staticmethod
+    def collect(data, professions: list):
+        """
+        Собирает статистику сразу для списка профессий за один проход по строкам. Общая статистика
+        считается один раз, названия вакансий проверяются одним ProfessionMatcher
+
+        Args:
+            data (Iterable[dict]) : Строки файла в виде словарей
+            professions (list) : Названия профессий
+
+        Returns:
+            dict: Профессия/Statistic
+        """
+        matcher = ProfessionMatcher(professions)
+        statistic = Statistic(None)
+        selected = [dict() for _ in professions]
+        for row_dict in data:
+            vacancy = Vacancy(row_dict)
+            statistic.add_vacancy(vacancy)
+            for index in matcher.find(vacancy.get_name):
+                count, all_salary = selected[index].get(vacancy.get_publish_time, (0, 0))
+                selected[index][vacancy.get_publish_time] = count + 1, all_salary + vacancy.get_average_salary
+        return {profession: statistic.with_selected(profession, selected[i]) for i, profession in enumerate(professions)}
+
+    def with_selected(self, selected_vacancy: str, year_to_selected: dict):
+        """
+        Возвращает копию статистики для другой выбранной вакансии
+
+        Args:
+            selected_vacancy (str) : Выбранная вакансия
+            year_to_selected (dict) : Год/(количество, сумма зарплат) выбранной вакансии
+
+        Returns:
+            Statistic: Статистика для выбранной вакансии
+        """
+        statistic = Statistic(selected_vacancy)
+        statistic.__vacancies_count = self.__vacancies_count
+        statistic.__cities = {name: copy.copy(city) for name, city in self.__cities.items()}
+        statistic.__publish_times = {name: publish_time.with_selected(selected_vacancy, *year_to_selected.get(name, (0, 0)))
+                                     for name, publish_time in self.__publish_times.items()}
+        return statistic
+
+    def merge(self, other):
+        """
+        Добавляет к статистике данные другого объекта Statistic по той же вакансии, например собранные
+        по другой части файла. Суммы и количества складываются, средние пересчитываются при следующем чтении
+
+        Args:
+            other (Statistic) : Статистика по другой части данных
+        """
+        for name, city in other.__cities.items():
+            if name not in self.__cities:
+                self.__cities[name] = city
+            else:
+                self.__cities[name].merge(city)
+        for name, publish_time in other.__publish_times.items():
+            if name not in self.__publish_times:
+                self.__publish_times[name] = publish_time
+            else:
+                self.__publish_times[name].merge(publish_time)
+        self.__vacancies_count += other.__vacancies_count
+        self.fulfillment = False
+        return self
+
+    def get_state(self) -> dict:
+        """
+        Возвращает суммы и количества статистики в виде словаря из встроенных типов, например для снимка
+
+        Returns:
+            dict: Количество вакансий, город/(количество, сумма зарплат),
+             год/(количество, сумма зарплат, количество и сумма зарплат выбранной вакансии)
+        """
+        return {"vacancies_count": self.__vacancies_count,
+                "cities": {name: city.get_state() for name, city in self.__cities.items()},
+                "publish_times": {name: publish_time.get_state() for name, publish_time in self.__publish_times.items()}}
+
+    @staticmethod
+    def from_state(selected_vacancy: str, state: dict):
+        """
+        Восстанавливает статистику из словаря, полученного get_state
+
+        Args:
+            selected_vacancy (str) : Выбранная вакансия
+            state (dict) : Суммы и количества статистики
+
+        Returns:
+            Statistic: Статистика
+        """
+        statistic = Statistic(selected_vacancy)
+        statistic.__vacancies_count = state["vacancies_count"]
+        statistic.__cities = {name: City.from_state(name, city) for name, city in state["cities"].items()}
+        statistic.__publish_times = {name: Year.from_state(name, selected_vacancy, publish_time)
+                                     for name, publish_time in state["publish_times"].items()}
+        return statistic
 
     def print_statistics(self):
         """
@@ -268,7 +402,6 @@ class City:
         __name (str) : Название Города
         __vacancy_count (int) : Количество вакансий в этом городе
         __all_salary (float): Сумма всех средних зарплат в этом городе
-        __average_salary (float) : Средняя зарплата по городу
     """
     def __init__(self, vacancy: Vacancy):
         """
@@ -280,17 +413,16 @@ class City:
         self.__name = vacancy.get_area_name
         self.__vacancy_count = 1
         self.__all_salary = vacancy.get_average_salary
-        self.__average_salary = vacancy.get_average_salary
 
     @property
     def get_average_salary(self):
         """
-        Геттер, который возвращает среднюю запрлату по городу
+        Геттер, который возвращает среднюю запрлату по городу, считается при обращении
 
         Returns:
             float: Среднюю запрлату по городу
         """
-        return self.__average_salary
+        return self.__all_salary / self.__vacancy_count
 
     @property
     def get_vacancy_count(self):
@@ -304,11 +436,46 @@ class City:
 
     def update(self, vacancy: Vacancy):
         """
-        Вычисляет среднюю зарплату по городу с каждым вызовом функции
+        Добавляет зарплату вакансии к сумме зарплат по городу
         """
         self.__vacancy_count += 1
         self.__all_salary += vacancy.get_average_salary
-        self.__average_salary = self.__all_salary / self.__vacancy_count
+
+    def merge(self, other):
+        """
+        Добавляет к городу количество и сумму зарплат из другого объекта City того же города
+
+        Args:
+            other (City) : Статистика по тому же городу, собранная по другой части файла
+        """
+        self.__vacancy_count += other.__vacancy_count
+        self.__all_salary += other.__all_salary
+
+    def get_state(self) -> tuple:
+        """
+        Возвращает количество вакансий и сумму зарплат по городу
+
+        Returns:
+            tuple: Количество вакансий, сумма зарплат
+        """
+        return self.__vacancy_count, self.__all_salary
+
+    @staticmethod
+    def from_state(name: str, state: tuple):
+        """
+        Восстанавливает город из кортежа, полученного get_state
+
+        Args:
+            name (str) : Название города
+            state (tuple) : Количество вакансий, сумма зарплат
+
+        Returns:
+            City: Статистика по городу
+        """
+        city = object.__new__(City)
+        city.__name = name
+        city.__vacancy_count, city.__all_salary = state
+        return city
 
 
 class Year:
@@ -319,11 +486,9 @@ class Year:
         __name (str) : Время публикации
         __vacancy_count (int) : Количество вакансий в файле
         __all_salary (float) : Сумма зарплат
-        __average_salary (float) : Средняя зарплата
         __selected_vacancy (str) : Выбранная вакансия
         __selected_vacancy_count (int) : Количество выбранной вакансии в файле
         __selected_vacancy_all_salary (float | int) : Сумма зарплат вакансии
-        __selected_vacancy_average_salary (float | int) : Средняя зарплата вакансии
     """
     def __init__(self, vacancy: Vacancy, get_selected_vacancy: str):
         """
@@ -331,18 +496,18 @@ class Year:
         vacancy - информацию о вакансии.
 
         Args:
-            get_selected_vacancy (str) : Выбранная вакансия
+            get_selected_vacancy (str | None) : Выбранная вакансия или None, если она задаётся позже через
+             with_selected
             vacancy (Vacancy) : Информацию о вакансии
         """
         self.__name = vacancy.get_publish_time
         self.__vacancy_count = 1
         self.__all_salary = vacancy.get_average_salary
-        self.__average_salary = vacancy.get_average_salary
         self.__selected_vacancy = get_selected_vacancy
 
-        self.__selected_vacancy_count = 1 if get_selected_vacancy in vacancy.get_name else 0
-        self.__selected_vacancy_all_salary = vacancy.get_average_salary if get_selected_vacancy in vacancy.get_name else 0
-        self.__selected_vacancy_average_salary = vacancy.get_average_salary if get_selected_vacancy in vacancy.get_name else 0
+        is_selected = get_selected_vacancy is not None and vacancy.is_selected(get_selected_vacancy)
+        self.__selected_vacancy_count = 1 if is_selected else 0
+        self.__selected_vacancy_all_salary = vacancy.get_average_salary if is_selected else 0
 
     @property
     def get_name(self):
@@ -357,12 +522,12 @@ class Year:
     @property
     def get_average_salary(self):
         """
-        Геттер, который возвращает средняя зарплата
+        Геттер, который возвращает средняя зарплата, считается при обращении
 
         Returns:
             dict: Средняя зарплата
         """
-        return self.__average_salary
+        return self.__all_salary / self.__vacancy_count
 
     @property
     def get_vacancy_count(self):
@@ -387,25 +552,85 @@ class Year:
     @property
     def get_selected_vacancy_average_salary(self):
         """
-        Геттер, который возвращает среднюю зарплату выбранной вакансии
+        Геттер, который возвращает среднюю зарплату выбранной вакансии, считается при обращении
 
         Returns:
             dict: Средняя зарплата выбранной вакансии
         """
-        return self.__selected_vacancy_average_salary
+        if self.__selected_vacancy_count == 0:
+            return 0
+        return self.__selected_vacancy_all_salary / self.__selected_vacancy_count
 
     def update(self, vacancy: Vacancy):
         """
-        Обновляет значения количество вакансий и среднюю зарплату выбранной вакансии
+        Обновляет количество вакансий и сумму зарплат, в том числе для выбранной вакансии
         """
         self.__vacancy_count += 1
         self.__all_salary += vacancy.get_average_salary
-        self.__average_salary = self.__all_salary / self.__vacancy_count
 
-        if self.__selected_vacancy in vacancy.get_name:
+        if self.__selected_vacancy is not None and vacancy.is_selected(self.__selected_vacancy):
             self.__selected_vacancy_count += 1
             self.__selected_vacancy_all_salary += vacancy.get_average_salary
-            self.__selected_vacancy_average_salary = self.__selected_vacancy_all_salary / self.__selected_vacancy_count
+
+    def with_selected(self, selected_vacancy: str, count: int, all_salary: float):
+        """
+        Возвращает копию года с другой выбранной вакансией
+
+        Args:
+            selected_vacancy (str) : Выбранная вакансия
+            count (int) : Количество выбранной вакансии за год
+            all_salary (float) : Сумма зарплат выбранной вакансии за год
+
+        Returns:
+            Year: Копия года
+        """
+        year = copy.copy(self)
+        year.__selected_vacancy = selected_vacancy
+        year.__selected_vacancy_count = count
+        year.__selected_vacancy_all_salary = all_salary
+        return year
+
+    def merge(self, other):
+        """
+        Добавляет к году количества и суммы зарплат из другого объекта Year того же года
+
+        Args:
+            other (Year) : Статистика по тому же году, собранная по другой части файла
+        """
+        self.__vacancy_count += other.__vacancy_count
+        self.__all_salary += other.__all_salary
+        self.__selected_vacancy_count += other.__selected_vacancy_count
+        self.__selected_vacancy_all_salary += other.__selected_vacancy_all_salary
+
+    def get_state(self) -> tuple:
+        """
+        Возвращает количества и суммы зарплат за год
+
+        Returns:
+            tuple: Количество вакансий, сумма зарплат, количество и сумма зарплат выбранной вакансии
+        """
+        return (self.__vacancy_count, self.__all_salary,
+                self.__selected_vacancy_count, self.__selected_vacancy_all_salary)
+
+    @staticmethod
+    def from_state(name, selected_vacancy: str, state: tuple):
+        """
+        Восстанавливает год из кортежа, полученного get_state
+
+        Args:
+            name (int) : Время публикации
+            selected_vacancy (str) : Выбранная вакансия
+            state (tuple) : Количество вакансий, сумма зарплат, количество и сумма зарплат выбранной вакансии
+
+        Returns:
+            Year: Статистика за год
+        """
+        year = object.__new__(Year)
+        year.__name = name
+        year.__selected_vacancy = selected_vacancy
+        (year.__vacancy_count, year.__all_salary,
+         year.__selected_vacancy_count, year.__selected_vacancy_all_salary) = state
+        return year
 
 
 class DataSet:
@@ -416,26 +641,51 @@ class DataSet:
         data (_reader) : Считанный файл
         titles (list[str]) : Название каждого столбца
     """
-    def __init__(self, file_name: str, get_selected_vacancy: str):
+    def __init__(self, file_name: str, get_selected_vacancy: str | list, shard: tuple = None):
         """
         Инициализирует объект DataSet, получает значения file_name для работы с файлом
          и get_selected_vacancy для работы с выбранной вакансией
 
         Args:
             file_name (str) : Название csv файла
-            get_selected_vacancy (str) : Название выбранной ванкансии
+            get_selected_vacancy (str | list) : Название выбранной ванкансии или список названий, тогда
+             статистика по каждому из них попадает в statistics
+            shard (tuple) : Диапазон байтов (начало, конец) из csv_shards.split_csv, если нужно прочитать
+             только часть файла. Если для файла построен NameIndex и читается весь файл, выбранная
+             вакансия ищется по индексу, а не в каждой строке
+        """
+        if shard is None:
+            file = open(file_name, 'r', encoding='utf-8-sig')
+            self.data = csv.reader(file, delimiter=',')
+            self.titles = next(self.data)
+        else:
+            self.titles = read_header(file_name)[0]
+            self.data = read_shard(file_name, *shard)
+        index = None
+        if isinstance(get_selected_vacancy, str) and (shard is None or shard[0] == read_header(file_name)[1]):
+            index = NameIndex.load(file_name)
+        self.get_dict_row(None if index is None else index.get_row_mask(get_selected_vacancy))
+        if isinstance(get_selected_vacancy, str):
+            self.statistic = Statistic(get_selected_vacancy)
+            self.statistic.enter_static_data(self.data)
+        else:
+            self.statistics = Statistic.collect(self.data, get_selected_vacancy)
+
+    def get_dict_row(self, selected_mask=None):
         """
-        file = open(file_name, 'r', encoding='utf-8-sig')
-        self.data = csv.reader(file, delimiter=',')
-        self.titles = next(self.data)
-        self.get_dict_row()
-        self.statistic = Statistic(get_selected_vacancy)
-        self.statistic.enter_static_data(self.data)
+        Убирает пустые поля и формирует словарь для удобной работы с данными
 
-    def get_dict_row(self):
-        """Убирает пустые поля и формирует словарь для удобной работы с данными"""
-        self.data = filter(lambda row: len(row) == len(self.titles) and "" not in row, self.data)
-        self.data = (dict(zip(self.titles, row)) for row in self.data)
+        Args:
+            selected_mask (np.ndarray) : Маска выбранной вакансии по непустым записям файла из NameIndex,
+             тогда признак попадает в словарь под ключом is_selected
+        """
+        if selected_mask is None:
+            self.data = filter(lambda row: len(row) == len(self.titles) and "" not in row, self.data)
+            self.data = (dict(zip(self.titles, row)) for row in self.data)
+            return
+        rows = zip(filter(None, self.data), selected_mask)
+        rows = filter(lambda x: len(x[0]) == len(self.titles) and "" not in x[0], rows)
+        self.data = (dict(zip(self.titles, row), is_selected=bool(is_selected)) for row, is_selected in rows)
 
 
 class Report:
@@ -505,71 +755,140 @@ class Report:
                 rows_list[cell][col] = columns[col][cell]
         return rows_list
 
-    def generate_image(self):
+    def draw_years(self, ax, keys: list, values: list, label: str, selected_values: list, selected_label: str, title: str):
         """
-        Функция делает и показывет графики отражающие динамику зарплат вакансии
+        Функция рисует столбцы по годам для всех вакансий и для выбранной вакансии
+
+        Attributes:
+            ax (Axes) : Ось для рисования
+            keys (list) : Года
+            values (list) : Значения для всех вакансий
+            label (str) : Легенда для всех вакансий
+            selected_values (list) : Значения для выбранной вакансии
+            selected_label (str) : Легенда для выбранной вакансии
+            title (str) : Название графика
+
+        Returns:
+            BarContainer: Столбцы выбранной вакансии
         """
-        temp, matrix_of_graphs = table.subplots(2, 2)
         width = 0.4
-        abscissa = np.arange(len(self.__statistic.get_salary_dynamic.keys()))
-        matrix_of_graphs[0, 0].bar(abscissa-width/2, self.__statistic.get_salary_dynamic.values(), width=width, label='средняя з/п')
-        matrix_of_graphs[0, 0].bar(abscissa+width/2, self.__statistic.get_selected_salary_dynamic.values(), width=width, label='з/п программист')
-        matrix_of_graphs[0, 0].set_xticks(abscissa, self.__statistic.get_salary_dynamic.keys())
-        matrix_of_graphs[0, 0].set_xticklabels(self.__statistic.get_salary_dynamic.keys(), rotation='vertical', va='top', ha='center')
-        matrix_of_graphs[0, 0].set_title('Уровень зарплат по годам')
-        matrix_of_graphs[0, 0].grid(True, axis='y')
-        matrix_of_graphs[0, 0].tick_params(axis='both', labelsize=8)
-        matrix_of_graphs[0, 0].legend(fontsize=8)
-
-        matrix_of_graphs[0, 1].bar(abscissa-width/2, self.__statistic.get_vacancies_dynamic.values(), width=width, label='Количество вакансий')
-        matrix_of_graphs[0, 1].bar(abscissa+width/2, self.__statistic.get_selected_vacancies_dynamic.values(), width=width, label='Количество вакансий\nпрограммист')
-        matrix_of_graphs[0, 1].set_xticks(abscissa, self.__statistic.get_vacancies_dynamic.keys())
-        matrix_of_graphs[0, 1].set_xticklabels(self.__statistic.get_vacancies_dynamic.keys(), rotation='vertical', va='top', ha='center')
-        matrix_of_graphs[0, 1].set_title('Количество вакансий по годам')
-        matrix_of_graphs[0, 1].grid(True, axis='y')
-        matrix_of_graphs[0, 1].tick_params(axis='both', labelsize=8)
-        matrix_of_graphs[0, 1].legend(fontsize=8)
-
-        matrix_of_graphs[1, 0].set_title("Уровень зарплат по городам")
-        matrix_of_graphs[1, 0].invert_yaxis()
+        abscissa = np.arange(len(keys))
+        ax.bar(abscissa-width/2, values, width=width, label=label)
+        selected = ax.bar(abscissa+width/2, selected_values, width=width, label=selected_label)
+        ax.set_xticks(abscissa, keys)
+        ax.set_xticklabels(keys, rotation='vertical', va='top', ha='center')
+        ax.set_title(title)
+        ax.grid(True, axis='y')
+        ax.tick_params(axis='both', labelsize=8)
+        ax.legend(fontsize=8)
+        return selected
+
+    def draw_cities(self, ax):
+        """
+        Функция рисует уровень зарплат по городам
+
+        Attributes:
+            ax (Axes) : Ось для рисования
+        """
+        ax.set_title("Уровень зарплат по городам")
+        ax.invert_yaxis()
         data = self.__statistic.get_city_salary_dynamic
         courses = list(data.keys())
         courses = [label.replace(' ', '\n').replace('-', '-\n') for label in courses]
         values = list(data.values())
-        matrix_of_graphs[1, 0].tick_params(axis='both', labelsize=8)
-        matrix_of_graphs[1, 0].set_yticklabels(courses, fontsize=6, va='center', ha='right')
-        matrix_of_graphs[1, 0].barh(courses, values)
-        matrix_of_graphs[1, 0].grid(True, axis='x')
+        ax.tick_params(axis='both', labelsize=8)
+        ax.set_yticklabels(courses, fontsize=6, va='center', ha='right')
+        ax.barh(courses, values)
+        ax.grid(True, axis='x')
 
+    def draw_shares(self, ax):
+        """
+        Функция рисует доли вакансий по городам
+
+        Attributes:
+            ax (Axes) : Ось для рисования
+        """
         other = 1 - sum((list(self.__statistic.get_city_vacancies_dynamic.values())))
         new_dic = {'Другие': other}
         new_dic.update(self.__statistic.get_city_vacancies_dynamic)
         area_count_dic = new_dic
         labels = list(area_count_dic.keys())
         sizes = list(area_count_dic.values())
-        matrix_of_graphs[1, 1].pie(sizes, labels=labels, textprops={'fontsize': 6})
-        matrix_of_graphs[1, 1].axis('scaled')
-        matrix_of_graphs[1, 1].set_title("Доля вакансий по городам")
-        table.tight_layout()
-        table.savefig('graph.png', dpi=300)
-        table.show()
+        ax.pie(sizes, labels=labels, textprops={'fontsize': 6})
+        ax.axis('scaled')
+        ax.set_title("Доля вакансий по городам")
+
+    def draw_image(self, figure: ReportFigure):
+        """
+        Функция рисует графики отражающие динамику зарплат вакансии. При пакетном построении передаётся одна фигура
+        на все отчёты, и на ней перерисовывается только то, что отличается от предыдущего отчёта
+
+        Attributes:
+            figure (ReportFigure) : Фигура для рисования
+        """
+        salary = self.__statistic.get_salary_dynamic
+        selected_salary = list(self.__statistic.get_selected_salary_dynamic.values())
+        vacancies = self.__statistic.get_vacancies_dynamic
+        selected_vacancies = list(self.__statistic.get_selected_vacancies_dynamic.values())
+        figure.draw((0, 0), (tuple(salary.items()), len(selected_salary)), selected_salary, self.draw_years,
+                    list(salary.keys()), list(salary.values()), 'средняя з/п', selected_salary, 'з/п программист',
+                    'Уровень зарплат по годам')
+        figure.draw((0, 1), (tuple(vacancies.items()), len(selected_vacancies)), selected_vacancies, self.draw_years,
+                    list(vacancies.keys()), list(vacancies.values()), 'Количество вакансий', selected_vacancies,
+                    'Количество вакансий\nпрограммист', 'Количество вакансий по годам')
+        figure.draw((1, 0), tuple(self.__statistic.get_city_salary_dynamic.items()), None, self.draw_cities)
+        figure.draw((1, 1), tuple(self.__statistic.get_city_vacancies_dynamic.items()), None, self.draw_shares)
+
+    def generate_image(self, image_name: str = 'graph.png', figure: ReportFigure = None):
+        """
+        Функция сохраняет графики в png файл. Если фигура не передана, графики рисуются на новой фигуре,
+        которая закрывается после сохранения
+
+        Attributes:
+            image_name (str) : Название png файла
+            figure (ReportFigure) : Фигура для рисования
+        """
+        if figure is None:
+            with ReportFigure() as figure:
+                return self.generate_image(image_name, figure)
+        self.draw_image(figure)
+        figure.save(image_name, dpi=300)
 
-    def generate_pdf(self, choice: str):
+    def get_image_uri(self, image_format: str = 'png', figure: ReportFigure = None):
         """
-        Функция генерирует пдф в соответсвии шаблону html
+        Функция рисует графики в памяти для вставки в html без файла на диске
+
+        Attributes:
+            image_format (str) : Формат изображения (png, svg)
+            figure (ReportFigure) : Фигура для рисования
+
+        Returns:
+            str: Графики в виде data URI
+        """
+        if figure is None:
+            with ReportFigure() as figure:
+                return self.get_image_uri(image_format, figure)
+        self.draw_image(figure)
+        return figure.get_data_uri(image_format, dpi=300)
+
+    def render_html(self, choice: str, image_file: str = None):
+        """
+        Функция заполняет шаблон html для пдф
 
         Attributes:
             choice (str) : Значение, которое хочет пользователь видеть в пдф только графики/только таблицу/все сразу
+            image_file (str) : Графики в виде data URI (см. get_image_uri), не нужны для "Статистика"
+
+        Returns:
+            str: Страница html для пдф
         """
-        image_file = 'graph.png'
-        env = Environment(loader=FileSystemLoader('.'))
         if (choice == "Вакансии"):
-            template = env.get_template("pdf_template_img.html")
+            template = get_template("pdf_template_img.html")
             pdf_template = template.render({"title": "Аналитика по зарплатам и городам для профессии " + self.__statistic.get_selected_vacancy,
                                             "image_file": image_file,
                                             })
         elif (choice == "Статистика"):
-            template = env.get_template("pdf_template_statistic.html")
+            template = get_template("pdf_template_statistic.html")
             pdf_template = template.render(
                 {"title": "Аналитика по зарплатам и городам для профессии " + self.__statistic.get_selected_vacancy,
                  "years_title": "Статистика по годам",
@@ -581,7 +900,7 @@ class Report:
                  "cities_rows": self.sheet_2_rows
                  })
         else:
-            template = env.get_template("pdf_template.html")
+            template = get_template("pdf_template.html")
             pdf_template = template.render(
                 {"title": "Аналитика по зарплатам и городам для профессии " + self.__statistic.get_selected_vacancy,
                  "image_file": image_file,
@@ -593,8 +912,41 @@ class Report:
                  "count_columns": len(self.sheet_2_headers),
                  "cities_rows": self.sheet_2_rows
                  })
-        config = pdfkit.configuration(wkhtmltopdf=r"C:/Program Files/wkhtmltopdf/bin/wkhtmltopdf.exe")
-        pdfkit.from_string(pdf_template, 'report.pdf', configuration=config, options={"enable-local-file-access": True})
+        return pdf_template
+
+    @staticmethod
+    def write_pdf(pdf_template: str):
+        """
+        Функция записывает пдф по странице html
+
+        Attributes:
+            pdf_template (str) : Страница html для пдф
+        """
+        get_backend().write(pdf_template, 'report.pdf')
+
+    def generate_report(self, choice: str, image_format: str = 'png'):
+        """
+        Функция генерирует excel и пдф одновременно с графиками: excel не зависит от остальных этапов,
+        html заполняется графиками, нарисованными в памяти, пдф пишется после html. Для "Статистика"
+        графики не рисуются
+
+        Attributes:
+            choice (str) : Значение, которое хочет пользователь видеть в пдф только графики/только таблицу/все сразу
+            image_format (str) : Формат графиков в пдф (png, svg)
+
+        Returns:
+            ReportPipeline: Выполненный граф этапов со временем каждого этапа
+        """
+        pipeline = ReportPipeline()
+        pipeline.add("excel", self.generate_excel)
+        if choice == "Статистика":
+            pipeline.add("html", self.render_html, choice)
+        else:
+            pipeline.add("image", self.get_image_uri, image_format)
+            pipeline.add("html", self.render_html, choice, inputs=("image",))
+        pipeline.add("pdf", self.write_pdf, inputs=("html",))
+        pipeline.run()
+        return pipeline
 
     def generate_excel(self):
         """
@@ -668,6 +1020,74 @@ class Report:
             ws[column_name + str(i + 2)].border = self.border
 
 
+def get_shard_statistic(file_name: str, profession_name: str, shard: tuple):
+    """
+    Собирает статистику по одному диапазону байтов файла (выполняется в отдельном процессе)
+
+    Attributes:
+        file_name (str) : Название csv файла
+        profession_name (str) : Название выбранной вакансии
+        shard (tuple) : Диапазон байтов (начало, конец)
+
+    Returns:
+        Statistic: Статистика по диапазону
+    """
+    return DataSet(file_name, profession_name, shard).statistic
+
+
+def collect_statistic(file_name: str, profession_name: str, workers: int = None):
+    """
+    Параллельно собирает статистику по диапазонам файла и объединяет её через Statistic.merge
+
+    Attributes:
+        file_name (str) : Название csv файла
+        profession_name (str) : Название выбранной вакансии
+        workers (int) : Количество процессов, по умолчанию - количество ядер
+
+    Returns:
+        Statistic: Статистика по всему файлу
+    """
+    workers = workers or os.cpu_count()
+    shards = split_csv(file_name, workers * 4)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        statistics = executor.map(get_shard_statistic, repeat(file_name), repeat(profession_name), shards)
+        return reduce(Statistic.merge, statistics, Statistic(profession_name))
+
+
+def update_statistic(file_name: str, profession_name: str):
+    """
+    Дочитывает строки, дописанные в файл после прошлого запуска, складывает их со снимком статистики
+    и сохраняет новый снимок. Если снимка нет или начало файла изменилось, файл читается целиком
+
+    Attributes:
+        file_name (str) : Название csv файла
+        profession_name (str) : Название выбранной вакансии
+
+    Returns:
+        Statistic: Статистика по всему файлу
+    """
+    state, offset = load_snapshot(file_name, "statistic." + profession_name)
+    statistic = Statistic(profession_name) if state is None else Statistic.from_state(profession_name, state)
+    size = os.path.getsize(file_name)
+    if offset < size:
+        statistic.merge(DataSet(file_name, profession_name, (offset, size)).statistic)
+    save_snapshot(file_name, "statistic." + profession_name, statistic.get_state(), size)
+    return statistic
+
+
+def generate_images(statistics: dict):
+    """
+    Рисует графики для списка профессий на одной фигуре в файлы graph_<профессия>.png. Общие графики
+    (по городам и по всем вакансиям) рисуются один раз, для каждой профессии меняются только её столбцы
+
+    Attributes:
+        statistics (dict) : Профессия/Statistic, например DataSet(file_name, professions).statistics
+    """
+    with ReportFigure() as figure:
+        for profession, statistic in statistics.items():
+            Report(statistic).generate_image(f'graph_{profession}.png', figure)
+
+
 def final_process():
     """
     Ввод данных пользователя и передача их в классы
@@ -676,11 +1096,10 @@ def final_process():
     profession_name = 'Программист'
     # file_name = input("Введите название файла: ")
     # profession_name = input("Введите название профессии: ")
-    data_set = DataSet(file_name, profession_name)
-    # data_set.statistic.print_statistics()
-    report = Report(data_set.statistic)
-    report.generate_excel()
-    report.generate_image()
-    report.generate_pdf(input('Введите данные для печати: '))
-
-final_process()
\ No newline at end of file
+    statistic = update_statistic(file_name, profession_name)
+    # statistic.print_statistics()
+    report = Report(statistic)
+    report.generate_report(input('Введите данные для печати: ')).print_timings()
+
+if __name__ == '__main__':
+    final_process()
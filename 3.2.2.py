@@ -1,12 +1,15 @@
 import time
 
 import csv, re, math, os
-import matplotlib.pyplot as plt
 from matplotlib.axes import Axes
 import multiprocess as mp
 
-from jinja2 import Template
-import pdfkit
+from csv_shards import read_header, split_csv, read_shard
+from aggregate_snapshot import load_snapshot, save_snapshot
+from date_parsing import get_year
+from report_figure import ReportFigure
+from pdf_backends import get_backend
+from template_registry import get_template
 
 
 currency_to_rub = {
@@ -74,7 +77,7 @@ class Vacancy:
         """
         self.dictionary = dictionary
         self.salary = Salary(dictionary)
-        self.dictionary["year"] = int(dictionary["published_at"][:4])
+        self.dictionary["year"] = get_year(dictionary["published_at"])
         self.is_needed = dictionary["is_needed"]
 
 
@@ -85,14 +88,24 @@ class DataSet:
         csv_direction (str): папка расположения всех csv-файлов.
         profession (str): Название профессии.
         file_name (str): Название большого файла с данными.
+        mode (str): Способ обработки: "chunks" - через csv-файлы по годам, "stream" - за один проход
+            без промежуточных файлов, "pool" - в пуле процессов по диапазонам байтов исходного файла,
+            "incremental" - дочитывает только новые строки к сохранённому снимку сумм.
+        workers (int): Количество процессов для режима "pool", по умолчанию - количество ядер.
     """
-    def __init__(self, csv_direction: str, profession: str, file_name: str):
+    def __init__(self, csv_direction: str, profession: str, file_name: str, mode: str = "chunks",
+                 workers: int = None):
         """Инициализация класса DataSet. Чтение. Фильтрация. Форматирование.
 
         Args:
             csv_direction (str): папка расположения всех csv-файлов.
             profession (str): Название профессии.
             file_name (str): Название большого файла с данными.
+            mode (str): Способ обработки: "chunks", "stream", "pool" или "incremental".
+            workers (int): Количество процессов для режима "pool".
+
+        Raises:
+            ValueError: Способ обработки не поддерживается.
         """
         self.csv_direction = csv_direction
         self.profession = profession
@@ -105,7 +118,16 @@ class DataSet:
         self.area_to_salary = {}
         self.area_to_piece = {}
 
-        area_to_sum, area_to_count = self.csv_divide(file_name)
+        if mode == "stream":
+            area_to_sum, area_to_count = self.csv_stream(file_name)
+        elif mode == "pool":
+            area_to_sum, area_to_count = self.csv_pool(file_name, workers)
+        elif mode == "incremental":
+            area_to_sum, area_to_count = self.csv_incremental(file_name)
+        elif mode == "chunks":
+            area_to_sum, area_to_count = self.csv_divide(file_name)
+        else:
+            raise ValueError(f"Неизвестный способ обработки: {mode}")
 
         self.count_area_data(area_to_sum, area_to_count)
         self.sort_year_dicts()
@@ -249,7 +271,7 @@ class DataSet:
             self.start_line = next(file)
             year_index = self.start_line.index("published_at")
             next_line = next(file)
-            current_year = int(next_line[year_index][:4])
+            current_year = get_year(next_line[year_index])
             data_years = [next_line]
             for line in file:
                 if not ("" in line) and len(line) == len(self.start_line):
@@ -276,6 +298,80 @@ class DataSet:
             self.csv_reader(read_queue)
             return area_to_sum, area_to_count
 
+    def csv_stream(self, file_name: str):
+        """Считает данные по годам и городам за один проход, без промежуточных csv-файлов.
+
+        Args:
+            file_name (str): название большого файла с данными.
+
+        Returns:
+            (dict, dict): словарь город/вся зарплата, словарь город/кол-во вакансий.
+        """
+        with open(file_name, "r", encoding='utf-8-sig', newline='') as csv_file:
+            file = csv.reader(csv_file)
+            self.start_line = next(file)
+            partial = aggregate_lines(file, self.start_line, self.profession)
+        return self.merge_partials([partial])
+
+    def csv_pool(self, file_name: str, workers: int):
+        """Считает данные по годам и городам в пуле процессов, каждый из которых читает свой диапазон байтов.
+        Диапазоны выровнены по началу записей, поэтому сортировка файла по годам не нужна.
+
+        Args:
+            file_name (str): название большого файла с данными.
+            workers (int): количество процессов, по умолчанию - количество ядер.
+
+        Returns:
+            (dict, dict): словарь город/вся зарплата, словарь город/кол-во вакансий.
+        """
+        workers = workers or os.cpu_count()
+        self.start_line = read_header(file_name)[0]
+        shards = split_csv(file_name, workers * 4)
+        args = [(file_name, start, end, self.start_line, self.profession) for start, end in shards]
+        with mp.Pool(workers) as processes:
+            partials = processes.starmap(read_csv_shard, args)
+        return self.merge_partials(partials)
+
+    def csv_incremental(self, file_name: str):
+        """Складывает снимок сумм с прошлого запуска с суммами по строкам, дописанным в файл после него,
+        и сохраняет новый снимок. Без снимка файл читается целиком.
+
+        Args:
+            file_name (str): название большого файла с данными.
+
+        Returns:
+            (dict, dict): словарь город/вся зарплата, словарь город/кол-во вакансий.
+        """
+        self.start_line = read_header(file_name)[0]
+        saved, offset = load_snapshot(file_name, "dataset." + self.profession)
+        size = os.path.getsize(file_name)
+        partials = [] if saved is None else [saved]
+        partials.append(aggregate_lines(read_shard(file_name, offset, size), self.start_line, self.profession))
+        area_to_sum, area_to_count = self.merge_partials(partials)
+        save_snapshot(file_name, "dataset." + self.profession, self.totals, size)
+        return area_to_sum, area_to_count
+
+    def merge_partials(self, partials: list):
+        """Складывает частичные суммы в порядке следования диапазонов и считает средние зарплаты по годам.
+
+        Args:
+            partials (list): Частичные суммы, посчитанные aggregate_lines.
+
+        Returns:
+            (dict, dict): словарь город/вся зарплата, словарь город/кол-во вакансий.
+        """
+        total = {key: {} for key in PARTIAL_KEYS}
+        for partial in partials:
+            for key, dictionary in partial.items():
+                for sub_key, val in dictionary.items():
+                    DataSet.try_to_add(total[key], sub_key, val)
+        self.totals = total
+        self.year_to_count = total["year_to_count"]
+        self.year_to_count_needed = {year: total["year_to_count_needed"].get(year, 0) for year in self.year_to_count}
+        self.year_to_salary = DataSet.get_avg_salary(self.year_to_count, total["year_to_sum"])
+        self.year_to_salary_needed = DataSet.get_avg_salary(self.year_to_count_needed, total["year_to_sum_needed"])
+        return total["area_to_sum"], total["area_to_count"]
+
     def csv_reader(self, read_queue: mp.Queue):
         """Чтение данных и складывание их результатов воедино.
 
@@ -358,25 +454,56 @@ class Report:
         return rows_list
 
 
-    def generate_image(self, file_name: str):
-        """Функция создания png-файла с графиками.
+    def draw_image(self, figure: ReportFigure):
+        """Функция рисования графиков. При пакетном построении передаётся одна фигура на все отчёты,
+        и на ней перерисовывается только то, что отличается от предыдущего отчёта.
+
+        Args:
+            figure (ReportFigure): Фигура для рисования.
+        """
+        data = self.data
+        figure.draw((0, 0), (tuple(data.year_to_salary.items()), tuple(data.year_to_salary_needed.keys())),
+                    list(data.year_to_salary_needed.values()), self.standart_chart,
+                    data.year_to_salary.keys(), data.year_to_salary_needed.keys(),
+                    data.year_to_salary.values(), data.year_to_salary_needed.values(),
+                    "Средняя з/п", "з/п программист", "Уровень зарплат по годам")
+        figure.draw((0, 1), (tuple(data.year_to_count.items()), tuple(data.year_to_count_needed.keys())),
+                    list(data.year_to_count_needed.values()), self.standart_chart,
+                    data.year_to_count.keys(), data.year_to_count_needed.keys(),
+                    data.year_to_count.values(), data.year_to_count_needed.values(),
+                    "Количество вакансий", "Количество вакансий программист", "Количество вакансий по годам")
+        figure.draw((1, 0), tuple(data.area_to_salary.items()), None, self.horizontal_chart)
+        figure.draw((1, 1), tuple(data.area_to_piece.items()), None, self.diogram)
+
+    def generate_image(self, file_name: str, figure: ReportFigure = None):
+        """Функция создания png-файла с графиками. Без фигуры графики рисуются на новой фигуре, которая
+        закрывается после сохранения.
 
         Args:
             file_name (str): название получившегося файла.
+            figure (ReportFigure): Фигура для рисования.
         """
-        fig, axis = plt.subplots(2, 2)
-        plt.rcParams['font.size'] = 8
-        self.standart_chart(axis[0, 0], self.data.year_to_salary.keys(), self.data.year_to_salary_needed.keys(),
-                          self.data.year_to_salary.values(), self.data.year_to_salary_needed.values(),
-                          "Средняя з/п", "з/п программист", "Уровень зарплат по годам")
-        self.standart_chart(axis[0, 1], self.data.year_to_count.keys(), self.data.year_to_count_needed.keys(),
-                          self.data.year_to_count.values(), self.data.year_to_count_needed.values(),
-                          "Количество вакансий", "Количество вакансий программист", "Количество вакансий по годам")
-        self.horizontal_chart(axis[1, 0])
-        self.diogram(axis[1, 1], plt)
-        fig.set_size_inches(16, 9)
-        fig.tight_layout(h_pad=2)
-        fig.savefig(file_name)
+        if figure is None:
+            with ReportFigure((16, 9), pad_font_size=16) as figure:
+                return self.generate_image(file_name, figure)
+        self.draw_image(figure)
+        figure.save(file_name, h_pad=2)
+
+    def get_image_uri(self, image_format: str = "png", figure: ReportFigure = None) -> str:
+        """Нарисовать графики в памяти для вставки в HTML без файла на диске.
+
+        Args:
+            image_format (str): Формат изображения (png, svg).
+            figure (ReportFigure): Фигура для рисования.
+
+        Returns:
+            str: Графики в виде data URI.
+        """
+        if figure is None:
+            with ReportFigure((16, 9), pad_font_size=16) as figure:
+                return self.get_image_uri(image_format, figure)
+        self.draw_image(figure)
+        return figure.get_data_uri(image_format, h_pad=2)
 
     def standart_chart(self, ax: Axes, keys1, keys2, values1, values2, label1, label2, title):
         """Функция создания 2-х обычных столбчатых диаграмм на одном поле.
@@ -390,15 +517,21 @@ class Report:
             label1 (str): Легенда первого графика.
             label2 (str): Легенда второго графика.
             title (str): Название поля.
+
+        Returns:
+            BarContainer: Столбцы второго графика.
         """
         x1 = [key - 0.2 for key in keys1]
         x2 = [key + 0.2 for key in keys2]
         ax.bar(x1, values1, width=0.4, label=label1)
-        ax.bar(x2, values2, width=0.4, label=label2)
-        ax.legend()
+        bars = ax.bar(x2, values2, width=0.4, label=label2)
+        ax.legend(fontsize=8)
         ax.set_title(title, fontsize=16)
         ax.grid(axis="y")
+        ax.tick_params(axis='both', labelsize=10)
+        ax.yaxis.get_offset_text().set_fontsize(10)
         ax.tick_params(axis='x', labelrotation=90)
+        return bars
 
     def horizontal_chart(self, ax: Axes):
         """Функция создания горизонтальной диаграммы.
@@ -410,43 +543,42 @@ class Report:
         ax.grid(axis="x")
         keys = [key.replace(" ", "\n").replace("-", "-\n") for key in list(self.data.area_to_salary.keys())]
         ax.barh(keys, self.data.area_to_salary.values())
+        ax.tick_params(axis='x', labelsize=10)
+        ax.xaxis.get_offset_text().set_fontsize(10)
         ax.tick_params(axis='y', labelsize=6)
         ax.set_yticks(keys)
         ax.set_yticklabels(labels=keys,
                            verticalalignment="center", horizontalalignment="right")
         ax.invert_yaxis()
 
-    def diogram(self, ax: Axes, plt):
+    def diogram(self, ax: Axes):
         """Функция создания круговой диаграммы.
 
         Args:
             ax (Axes): Глобальная позиция графика (поле для рисования).
-            plt (Plot): Общее поле для рисования всех графиков.
         """
         ax.set_title("Доля вакансий по городам", fontsize=16)
-        plt.rcParams['font.size'] = 8
-        dictionary = self.data.area_to_piece
+        dictionary = dict(self.data.area_to_piece)
         dictionary["Другие"] = 1 - sum([value for value in dictionary.values()])
         keys = list(dictionary.keys())
-        ax.pie(x=list(dictionary.values()), labels=keys)
+        ax.pie(x=list(dictionary.values()), labels=keys, textprops={"fontsize": 8})
         ax.axis('equal')
         ax.tick_params(axis="both", labelsize=6)
-        plt.rcParams['font.size'] = 16
 
 
-    def generate_pdf(self, file_name: str):
-        """Сгенерировать pdf-файл из получившихся данных, png-графиков, и HTML-шаблона с названием new_template.html.
+    def render_html(self, image_uri: str) -> str:
+        """Заполнить HTML-шаблон new_template.html таблицами и графиками.
 
         Args:
-            file_name (str): Название pdf-файла с графиками и таблицами.
+            image_uri (str): Графики в виде data URI (см. get_image_uri).
+
+        Returns:
+            str: HTML-страница отчёта.
         """
-        image_name = "graph.png"
-        self.generate_image(image_name)
-        html = open("new_template.html").read()
-        template = Template(html)
+        template = get_template("new_template.html")
         result_dict = {
             "profession_name": "Аналитика по зарплатам и городам для профессии " + self.data.profession,
-            "image_name": "D:/GitHub/Tarasov/" + image_name,
+            "image_name": image_uri,
             "year_head": "Статистика по годам",
             "city_head": "Статистика по городам",
             "years_headers": self.sheet_1_headers,
@@ -455,9 +587,78 @@ class Report:
             "count_columns": len(self.sheet_2_headers),
             "cities_rows": self.sheet_2_rows
         }
-        pdf_template = template.render(result_dict)
-        config = pdfkit.configuration(wkhtmltopdf=r"C:/Program Files/wkhtmltopdf/bin/wkhtmltopdf.exe")
-        pdfkit.from_string(pdf_template, file_name, configuration=config, options={"enable-local-file-access": True})
+        return template.render(result_dict)
+
+    @staticmethod
+    def write_pdf(file_name: str, pdf_template: str):
+        """Записать pdf-файл по HTML-странице отчёта.
+
+        Args:
+            file_name (str): Название pdf-файла.
+            pdf_template (str): HTML-страница отчёта.
+        """
+        get_backend().write(pdf_template, file_name)
+
+    def generate_pdf(self, file_name: str, figure: ReportFigure = None, image_format: str = "png"):
+        """Сгенерировать pdf-файл из получившихся данных, графиков, и HTML-шаблона с названием new_template.html.
+        Графики рисуются в памяти и вставляются в HTML-страницу, поэтому отчёты не делят общий файл с графиками.
+        Каждый этап использует результат предыдущего, поэтому они выполняются по очереди в текущем потоке.
+
+        Args:
+            file_name (str): Название pdf-файла с графиками и таблицами.
+            figure (ReportFigure): Фигура для графиков, см. draw_image.
+            image_format (str): Формат графиков (png, svg).
+        """
+        self.write_pdf(file_name, self.render_html(self.get_image_uri(image_format, figure)))
+
+
+PARTIAL_KEYS = ("year_to_sum", "year_to_count", "year_to_sum_needed", "year_to_count_needed",
+                "area_to_sum", "area_to_count")
+
+
+def aggregate_lines(lines, start_line: list, profession: str) -> dict:
+    """Считает частичные суммы и количества вакансий по годам и городам.
+
+    Args:
+        lines (Iterable): Строки csv-файла без заголовка.
+        start_line (list): Заголовок csv-файла.
+        profession (str): Название профессии.
+
+    Returns:
+        dict: Словарь название суммы/словарь год или город/значение, ключи - PARTIAL_KEYS.
+    """
+    partial = {key: {} for key in PARTIAL_KEYS}
+    for line in lines:
+        if not ("" in line) and len(line) == len(start_line):
+            new_dict_line = dict(zip(start_line, line))
+            new_dict_line["is_needed"] = (new_dict_line["name"]).find(profession) > -1
+            vac = Vacancy(new_dict_line)
+            year = vac.dictionary["year"]
+            salary = vac.salary.salary_in_rur
+            DataSet.try_to_add(partial["area_to_sum"], vac.dictionary["area_name"], salary)
+            DataSet.try_to_add(partial["area_to_count"], vac.dictionary["area_name"], 1)
+            DataSet.try_to_add(partial["year_to_sum"], year, salary)
+            DataSet.try_to_add(partial["year_to_count"], year, 1)
+            if vac.is_needed:
+                DataSet.try_to_add(partial["year_to_sum_needed"], year, salary)
+                DataSet.try_to_add(partial["year_to_count_needed"], year, 1)
+    return partial
+
+
+def read_csv_shard(file_name: str, start: int, end: int, start_line: list, profession: str) -> dict:
+    """Читает диапазон байтов csv-файла и считает по нему частичные суммы (выполняется в отдельном процессе).
+
+    Args:
+        file_name (str): Название большого файла с данными.
+        start (int): Начало диапазона в байтах.
+        end (int): Конец диапазона в байтах.
+        start_line (list): Заголовок csv-файла.
+        profession (str): Название профессии.
+
+    Returns:
+        dict: Частичные суммы, см. aggregate_lines.
+    """
+    return aggregate_lines(read_shard(file_name, start, end), start_line, profession)
 
 
 def do_exit(message):
@@ -470,15 +671,16 @@ def do_exit(message):
     exit(0)
 
 
-def create_pdf(csv_direction: str, file_name: str):
+def create_pdf(csv_direction: str, file_name: str, mode: str = "chunks", workers: int = None):
     file_csv_name = input("Введите название csv файла: ")
     profession = input("Введите название профессии: ")
     start_time = time.time()
-    if os.path.exists(csv_direction):
-        import shutil
-        shutil.rmtree(csv_direction)
-    os.mkdir(csv_direction)
-    data_set = DataSet(csv_direction, profession, file_csv_name)
+    if mode == "chunks":
+        if os.path.exists(csv_direction):
+            import shutil
+            shutil.rmtree(csv_direction)
+        os.mkdir(csv_direction)
+    data_set = DataSet(csv_direction, profession, file_csv_name, mode, workers)
     report = Report(data_set)
     report.generate_pdf(file_name)
     print("done: " + str(time.time() - start_time))
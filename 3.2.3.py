@@ -2,11 +2,18 @@ import time
 import concurrent.futures as pool
 
 import csv, re, math, os
-import matplotlib.pyplot as plt
+from array import array
+import numpy as np
 from matplotlib.axes import Axes
 
-from jinja2 import Template
-import pdfkit
+from csv_shards import read_header, split_csv, read_shard
+from aggregate_snapshot import load_snapshot, save_snapshot
+from date_parsing import get_year
+from profession_matcher import ProfessionMatcher
+from name_index import NameIndex
+from report_figure import ReportFigure
+from pdf_backends import get_backend
+from template_registry import get_template
 
 
 currency_to_rub = {
@@ -75,10 +82,109 @@ class Vacancy:
         """
         self.dictionary = dictionary
         self.salary = Salary(dictionary)
-        self.dictionary["year"] = int(dictionary["published_at"][:4])
+        self.dictionary["year"] = get_year(dictionary["published_at"])
         self.is_needed = dictionary["is_needed"]
 
 
+class VacancyTable:
+    """Колоночное представление вакансий: массивы NumPy вместо объектов Vacancy и Salary.
+
+    Attributes:
+        salary_from (np.ndarray): Нижние границы вилок оклада.
+        salary_to (np.ndarray): Верхние границы вилок оклада.
+        currency (np.ndarray): Индексы валют в currency_codes.
+        year (np.ndarray): Годы публикации.
+        name_codes (np.ndarray): Коды названий вакансий в names.
+        area_codes (np.ndarray): Коды городов в areas.
+        names (list): Уникальные названия вакансий.
+        areas (list): Уникальные названия городов.
+        rows (np.ndarray): Номер непустой записи файла для каждой вакансии (строка NameIndex).
+    """
+    currency_codes = list(currency_to_rub.keys())
+    currency_rates = np.array(list(currency_to_rub.values()))
+
+    def __init__(self, file_name: str):
+        """Инициализация объекта VacancyTable. Чтение csv-файла сразу в колонки.
+
+        Args:
+            file_name (str): Название большого файла с данными.
+        """
+        currency_index = {code: i for i, code in enumerate(self.currency_codes)}
+        name_index, area_index = {}, {}
+        salary_from, salary_to = array("d"), array("d")
+        currency, year, name_codes, area_codes, rows = array("b"), array("h"), array("i"), array("i"), array("i")
+        with open(file_name, "r", encoding='utf-8-sig', newline='') as csv_file:
+            file = csv.reader(csv_file)
+            header = next(file)
+            indexes = [header.index(column) for column in
+                       ("name", "salary_from", "salary_to", "salary_currency", "area_name", "published_at")]
+            for row, line in enumerate(filter(None, file)):
+                if "" in line or len(line) != len(header):
+                    continue
+                rows.append(row)
+                name, s_from, s_to, curr, area, published_at = [line[i] for i in indexes]
+                salary_from.append(float(s_from))
+                salary_to.append(float(s_to))
+                currency.append(currency_index[curr])
+                year.append(get_year(published_at))
+                name_codes.append(name_index.setdefault(name, len(name_index)))
+                area_codes.append(area_index.setdefault(area, len(area_index)))
+        self.salary_from = np.floor(np.frombuffer(salary_from, dtype=np.float64))
+        self.salary_to = np.floor(np.frombuffer(salary_to, dtype=np.float64))
+        self.currency = np.frombuffer(currency, dtype=np.int8)
+        self.year = np.frombuffer(year, dtype=np.int16)
+        self.name_codes = np.frombuffer(name_codes, dtype=np.int32)
+        self.area_codes = np.frombuffer(area_codes, dtype=np.int32)
+        self.rows = np.frombuffer(rows, dtype=np.int32)
+        self.names = list(name_index.keys())
+        self.areas = list(area_index.keys())
+
+    def __len__(self):
+        return len(self.year)
+
+    def salary_in_rur(self) -> np.ndarray:
+        """Средние значения вилок оклада в рублях.
+
+        Returns:
+            np.ndarray: Зарплата каждой вакансии в рублях.
+        """
+        return self.currency_rates[self.currency] * ((self.salary_to + self.salary_from) / 2)
+
+    def name_mask(self, profession: str, index: NameIndex = None) -> np.ndarray:
+        """Маска вакансий, в названии которых есть профессия. Поиск идёт по уникальным названиям
+        или, если передан индекс файла, по индексу.
+
+        Args:
+            profession (str): Название профессии.
+            index (NameIndex): Индекс названий того же файла.
+
+        Returns:
+            np.ndarray: Булев массив длиной в число вакансий.
+        """
+        if index is not None:
+            return index.get_row_mask(profession)[self.rows]
+        is_needed = np.array([name.find(profession) > -1 for name in self.names], dtype=bool)
+        return is_needed[self.name_codes]
+
+    @staticmethod
+    def group_by(codes: np.ndarray, keys: list, salary: np.ndarray) -> (dict, dict):
+        """Группировка зарплат по кодам: сумма и количество на каждый ключ.
+
+        Args:
+            codes (np.ndarray): Коды группы для каждой вакансии.
+            keys (list): Ключ для каждого кода.
+            salary (np.ndarray): Зарплаты вакансий.
+
+        Returns:
+            (dict, dict): Словарь ключ/сумма, словарь ключ/кол-во вакансий.
+        """
+        sums = np.bincount(codes, weights=salary, minlength=len(keys))
+        counts = np.bincount(codes, minlength=len(keys))
+        key_to_sum = {key: float(sums[i]) for i, key in enumerate(keys) if counts[i]}
+        key_to_count = {key: int(counts[i]) for i, key in enumerate(keys) if counts[i]}
+        return key_to_sum, key_to_count
+
+
 class DataSet:
     """Считывание файла и формирование удобной структуры данных.
 
@@ -86,14 +192,27 @@ class DataSet:
         csv_dir (str): папка расположения всех csv-файлов.
         profession (str): Название профессии.
         file_name (str): Название большого файла с данными.
+        mode (str): Способ обработки: "chunks" - через csv-файлы по годам, "stream" - за один проход
+            без промежуточных файлов, "pool" - в пуле процессов по диапазонам байтов исходного файла,
+            "incremental" - дочитывает только новые строки к сохранённому снимку сумм,
+            "columnar" - через VacancyTable.
+        workers (int): Количество процессов для режима "pool", по умолчанию - количество ядер.
+        partials (list): Уже посчитанные частичные суммы (см. create_datasets), файл тогда не читается.
     """
-    def __init__(self, csv_dir: str, profession: str, file_name: str):
+    def __init__(self, csv_dir: str, profession: str, file_name: str, mode: str = "chunks",
+                 workers: int = None, partials: list = None):
         """Инициализация класса DataSet. Чтение. Фильтрация. Форматирование.
 
         Args:
             csv_dir (str): папка расположения всех csv-файлов.
             profession (str): Название профессии.
             file_name (str): Название большого файла с данными.
+            mode (str): Способ обработки: "chunks", "stream", "pool", "incremental" или "columnar".
+            workers (int): Количество процессов для режима "pool".
+            partials (list): Уже посчитанные частичные суммы.
+
+        Raises:
+            ValueError: Способ обработки не поддерживается.
         """
         self.csv_dir = csv_dir
         self.profession = profession
@@ -105,7 +224,20 @@ class DataSet:
         self.area_to_salary = {}
         self.area_to_piece = {}
 
-        area_to_sum, area_to_count = self.csv_divide(file_name)
+        if partials is not None:
+            area_to_sum, area_to_count = self.merge_partials(partials)
+        elif mode == "columnar":
+            area_to_sum, area_to_count = self.columnar_aggregate(file_name)
+        elif mode == "stream":
+            area_to_sum, area_to_count = self.csv_stream(file_name)
+        elif mode == "pool":
+            area_to_sum, area_to_count = self.csv_pool(file_name, workers)
+        elif mode == "incremental":
+            area_to_sum, area_to_count = self.csv_incremental(file_name)
+        elif mode == "chunks":
+            area_to_sum, area_to_count = self.csv_divide(file_name)
+        else:
+            raise ValueError(f"Неизвестный способ обработки: {mode}")
 
         self.count_area_data(area_to_sum, area_to_count)
         self.sort_year_dicts()
@@ -224,7 +356,7 @@ class DataSet:
             self.start_line = next(file)
             year_index = self.start_line.index("published_at")
             next_line = next(file)
-            current_year = int(next_line[year_index][:4])
+            current_year = get_year(next_line[year_index])
             data_years = [next_line]
             for line in file:
                 if not ("" in line) and len(line) == len(self.start_line):
@@ -248,6 +380,102 @@ class DataSet:
             self.csv_reader(read_queue)
             return area_to_sum, area_to_count
 
+    def csv_stream(self, file_name: str):
+        """Считает данные по годам и городам за один проход, без промежуточных csv-файлов.
+
+        Args:
+            file_name (str): название большого файла с данными.
+
+        Returns:
+            (dict, dict): словарь город/вся зарплата, словарь город/кол-во вакансий.
+        """
+        with open(file_name, "r", encoding='utf-8-sig', newline='') as csv_file:
+            file = csv.reader(csv_file)
+            self.start_line = next(file)
+            partial = aggregate_lines(file, self.start_line, self.profession)
+        return self.merge_partials([partial])
+
+    def csv_pool(self, file_name: str, workers: int):
+        """Считает данные по годам и городам в пуле процессов, каждый из которых читает свой диапазон байтов.
+        Диапазоны выровнены по началу записей, поэтому сортировка файла по годам не нужна.
+
+        Args:
+            file_name (str): название большого файла с данными.
+            workers (int): количество процессов, по умолчанию - количество ядер.
+
+        Returns:
+            (dict, dict): словарь город/вся зарплата, словарь город/кол-во вакансий.
+        """
+        workers = workers or os.cpu_count()
+        self.start_line = read_header(file_name)[0]
+        shards = split_csv(file_name, workers * 4)
+        args = [(file_name, start, end, self.start_line, self.profession) for start, end in shards]
+        with pool.ProcessPoolExecutor(max_workers=workers) as executer:
+            partials = list(executer.map(read_csv_shard, *zip(*args)))
+        return self.merge_partials(partials)
+
+    def csv_incremental(self, file_name: str):
+        """Складывает снимок сумм с прошлого запуска с суммами по строкам, дописанным в файл после него,
+        и сохраняет новый снимок. Без снимка файл читается целиком.
+
+        Args:
+            file_name (str): название большого файла с данными.
+
+        Returns:
+            (dict, dict): словарь город/вся зарплата, словарь город/кол-во вакансий.
+        """
+        self.start_line = read_header(file_name)[0]
+        saved, offset = load_snapshot(file_name, "dataset." + self.profession)
+        size = os.path.getsize(file_name)
+        partials = [] if saved is None else [saved]
+        partials.append(aggregate_lines(read_shard(file_name, offset, size), self.start_line, self.profession))
+        area_to_sum, area_to_count = self.merge_partials(partials)
+        save_snapshot(file_name, "dataset." + self.profession, self.totals, size)
+        return area_to_sum, area_to_count
+
+    def merge_partials(self, partials: list):
+        """Складывает частичные суммы в порядке следования диапазонов и считает средние зарплаты по годам.
+
+        Args:
+            partials (list): Частичные суммы, посчитанные aggregate_lines.
+
+        Returns:
+            (dict, dict): словарь город/вся зарплата, словарь город/кол-во вакансий.
+        """
+        total = {key: {} for key in PARTIAL_KEYS}
+        for partial in partials:
+            for key, dictionary in partial.items():
+                for sub_key, val in dictionary.items():
+                    DataSet.try_to_add(total[key], sub_key, val)
+        self.totals = total
+        self.year_to_count = total["year_to_count"]
+        self.year_to_count_needed = {year: total["year_to_count_needed"].get(year, 0) for year in self.year_to_count}
+        self.year_to_salary = DataSet.get_middle_salary(self.year_to_count, total["year_to_sum"])
+        self.year_to_salary_needed = DataSet.get_middle_salary(self.year_to_count_needed, total["year_to_sum_needed"])
+        return total["area_to_sum"], total["area_to_count"]
+
+    def columnar_aggregate(self, file_name: str):
+        """Считает данные по годам и городам векторно, без разбиения на csv-файлы.
+
+        Args:
+            file_name (str): название большого файла с данными.
+
+        Returns:
+            (dict, dict): словарь город/вся зарплата, словарь город/кол-во вакансий.
+        """
+        table = VacancyTable(file_name)
+        salary = table.salary_in_rur()
+        min_year = int(table.year.min())
+        year_codes = table.year - min_year
+        years = list(range(min_year, int(table.year.max()) + 1))
+        year_to_sum, self.year_to_count = VacancyTable.group_by(year_codes, years, salary)
+        self.year_to_salary = DataSet.get_middle_salary(self.year_to_count, year_to_sum)
+        is_needed = table.name_mask(self.profession, NameIndex.load(file_name))
+        needed_sum, needed_count = VacancyTable.group_by(year_codes[is_needed], years, salary[is_needed])
+        self.year_to_count_needed = {year: needed_count.get(year, 0) for year in self.year_to_count}
+        self.year_to_salary_needed = DataSet.get_middle_salary(self.year_to_count_needed, needed_sum)
+        return VacancyTable.group_by(table.area_codes, table.areas, salary)
+
     def read_one_csv_file(self, file_name: str):
         """Читает один csv-файл и делает данные о нём.
 
@@ -370,15 +598,21 @@ class Report:
             label1 (str): Легенда первого графика.
             label2 (str): Легенда второго графика.
             title (str): Название поля.
+
+        Returns:
+            BarContainer: Столбцы второго графика.
         """
         x1 = [key - 0.2 for key in keys1]
         x2 = [key + 0.2 for key in keys2]
         ax.bar(x1, values1, width=0.4, label=label1)
-        ax.bar(x2, values2, width=0.4, label=label2)
-        ax.legend()
+        bars = ax.bar(x2, values2, width=0.4, label=label2)
+        ax.legend(fontsize=8)
         ax.set_title(title, fontsize=16)
         ax.grid(axis="y")
+        ax.tick_params(axis='both', labelsize=10)
+        ax.yaxis.get_offset_text().set_fontsize(10)
         ax.tick_params(axis='x', labelrotation=90)
+        return bars
 
     def horizontal_bar(self, ax: Axes):
         """Функция создания горизонтальной диаграммы.
@@ -390,62 +624,92 @@ class Report:
         ax.grid(axis="x")
         keys = [key.replace(" ", "\n").replace("-", "-\n") for key in list(self.data.area_to_salary.keys())]
         ax.barh(keys, self.data.area_to_salary.values())
+        ax.tick_params(axis='x', labelsize=10)
+        ax.xaxis.get_offset_text().set_fontsize(10)
         ax.tick_params(axis='y', labelsize=6)
         ax.set_yticks(keys)
         ax.set_yticklabels(labels=keys,
                            verticalalignment="center", horizontalalignment="right")
         ax.invert_yaxis()
 
-    def pie_diogramm(self, ax: Axes, plt):
+    def pie_diogramm(self, ax: Axes):
         """Функция создания круговой диаграммы.
 
         Args:
             ax (Axes): Глобальная позиция графика (поле для рисования).
-            plt (Plot): Общее поле для рисования всех графиков.
         """
         ax.set_title("Доля вакансий по городам", fontsize=16)
-        plt.rcParams['font.size'] = 8
-        dictionary = self.data.area_to_piece
+        dictionary = dict(self.data.area_to_piece)
         dictionary["Другие"] = 1 - sum([val for val in dictionary.values()])
         keys = list(dictionary.keys())
-        ax.pie(x=list(dictionary.values()), labels=keys)
+        ax.pie(x=list(dictionary.values()), labels=keys, textprops={"fontsize": 8})
         ax.axis('equal')
         ax.tick_params(axis="both", labelsize=6)
-        plt.rcParams['font.size'] = 16
 
-    def generate_image(self, file_name: str):
-        """Функция создания png-файла с графиками.
+    def draw_image(self, figure: ReportFigure):
+        """Функция рисования графиков. При пакетном построении передаётся одна фигура на все отчёты,
+        и на ней перерисовывается только то, что отличается от предыдущего отчёта.
+
+        Args:
+            figure (ReportFigure): Фигура для рисования.
+        """
+        data = self.data
+        figure.draw((0, 0), (tuple(data.year_to_salary.items()), tuple(data.year_to_salary_needed.keys())),
+                    list(data.year_to_salary_needed.values()), self.standart_bar,
+                    data.year_to_salary.keys(), data.year_to_salary_needed.keys(),
+                    data.year_to_salary.values(), data.year_to_salary_needed.values(),
+                    "Средняя з/п", "з/п программист", "Уровень зарплат по годам")
+        figure.draw((0, 1), (tuple(data.year_to_count.items()), tuple(data.year_to_count_needed.keys())),
+                    list(data.year_to_count_needed.values()), self.standart_bar,
+                    data.year_to_count.keys(), data.year_to_count_needed.keys(),
+                    data.year_to_count.values(), data.year_to_count_needed.values(),
+                    "Количество вакансий", "Количество вакансий программист", "Количество вакансий по годам")
+        figure.draw((1, 0), tuple(data.area_to_salary.items()), None, self.horizontal_bar)
+        figure.draw((1, 1), tuple(data.area_to_piece.items()), None, self.pie_diogramm)
+
+    def generate_image(self, file_name: str, figure: ReportFigure = None):
+        """Функция создания png-файла с графиками. Без фигуры графики рисуются на новой фигуре, которая
+        закрывается после сохранения.
 
         Args:
             file_name (str): название получившегося файла.
+            figure (ReportFigure): Фигура для рисования.
         """
-        fig, axis = plt.subplots(2, 2)
-        plt.rcParams['font.size'] = 8
-        self.standart_bar(axis[0, 0], self.data.year_to_salary.keys(), self.data.year_to_salary_needed.keys(),
-                          self.data.year_to_salary.values(), self.data.year_to_salary_needed.values(),
-                          "Средняя з/п", "з/п программист", "Уровень зарплат по годам")
-        self.standart_bar(axis[0, 1], self.data.year_to_count.keys(), self.data.year_to_count_needed.keys(),
-                          self.data.year_to_count.values(), self.data.year_to_count_needed.values(),
-                          "Количество вакансий", "Количество вакансий программист", "Количество вакансий по годам")
-        self.horizontal_bar(axis[1, 0])
-        self.pie_diogramm(axis[1, 1], plt)
-        fig.set_size_inches(16, 9)
-        fig.tight_layout(h_pad=2)
-        fig.savefig(file_name)
+        if figure is None:
+            with ReportFigure((16, 9), pad_font_size=16) as figure:
+                return self.generate_image(file_name, figure)
+        self.draw_image(figure)
+        figure.save(file_name, h_pad=2)
 
-    def generate_pdf(self, file_name: str):
-        """Сгенерировать pdf-файл из получившихся данных, png-графиков, и HTML-шаблона с названием new_template.html.
+    def get_image_uri(self, image_format: str = "png", figure: ReportFigure = None) -> str:
+        """Нарисовать графики в памяти для вставки в HTML без файла на диске.
 
         Args:
-            file_name (str): Название pdf-файла с графиками и таблицами.
+            image_format (str): Формат изображения (png, svg).
+            figure (ReportFigure): Фигура для рисования.
+
+        Returns:
+            str: Графики в виде data URI.
+        """
+        if figure is None:
+            with ReportFigure((16, 9), pad_font_size=16) as figure:
+                return self.get_image_uri(image_format, figure)
+        self.draw_image(figure)
+        return figure.get_data_uri(image_format, h_pad=2)
+
+    def render_html(self, image_uri: str) -> str:
+        """Заполнить HTML-шаблон new_template.html таблицами и графиками.
+
+        Args:
+            image_uri (str): Графики в виде data URI (см. get_image_uri).
+
+        Returns:
+            str: HTML-страница отчёта.
         """
-        image_name = "graph.png"
-        self.generate_image(image_name)
-        html = open("new_template.html").read()
-        template = Template(html)
+        template = get_template("new_template.html")
         keys_to_values = {
             "profession_name": "Аналитика по зарплатам и городам для профессии " + self.data.profession,
-            "image_name": "D:/GitHub/Tarasov/" + image_name,
+            "image_name": image_uri,
             "year_head": "Статистика по годам",
             "city_head": "Статистика по городам",
             "years_headers": self.sheet_1_headers,
@@ -454,9 +718,152 @@ class Report:
             "count_columns": len(self.sheet_2_headers),
             "cities_rows": self.sheet_2_rows
         }
-        pdf_template = template.render(keys_to_values)
-        config = pdfkit.configuration(wkhtmltopdf=r"C:/Program Files/wkhtmltopdf/bin/wkhtmltopdf.exe")
-        pdfkit.from_string(pdf_template, file_name, configuration=config, options={"enable-local-file-access": True})
+        return template.render(keys_to_values)
+
+    @staticmethod
+    def write_pdf(file_name: str, pdf_template: str):
+        """Записать pdf-файл по HTML-странице отчёта.
+
+        Args:
+            file_name (str): Название pdf-файла.
+            pdf_template (str): HTML-страница отчёта.
+        """
+        get_backend().write(pdf_template, file_name)
+
+    def generate_pdf(self, file_name: str, figure: ReportFigure = None, image_format: str = "png"):
+        """Сгенерировать pdf-файл из получившихся данных, графиков, и HTML-шаблона с названием new_template.html.
+        Графики рисуются в памяти и вставляются в HTML-страницу, поэтому отчёты не делят общий файл с графиками.
+        Каждый этап использует результат предыдущего, поэтому они выполняются по очереди в текущем потоке.
+
+        Args:
+            file_name (str): Название pdf-файла с графиками и таблицами.
+            figure (ReportFigure): Фигура для графиков, см. draw_image.
+            image_format (str): Формат графиков (png, svg).
+        """
+        self.write_pdf(file_name, self.render_html(self.get_image_uri(image_format, figure)))
+
+
+PARTIAL_KEYS = ("year_to_sum", "year_to_count", "year_to_sum_needed", "year_to_count_needed",
+                "area_to_sum", "area_to_count")
+
+
+def aggregate_lines(lines, start_line: list, profession: str) -> dict:
+    """Считает частичные суммы и количества вакансий по годам и городам.
+
+    Args:
+        lines (Iterable): Строки csv-файла без заголовка.
+        start_line (list): Заголовок csv-файла.
+        profession (str): Название профессии.
+
+    Returns:
+        dict: Словарь название суммы/словарь год или город/значение, ключи - PARTIAL_KEYS.
+    """
+    partial = {key: {} for key in PARTIAL_KEYS}
+    for line in lines:
+        if not ("" in line) and len(line) == len(start_line):
+            new_dict_line = dict(zip(start_line, line))
+            new_dict_line["is_needed"] = (new_dict_line["name"]).find(profession) > -1
+            vac = Vacancy(new_dict_line)
+            year = vac.dictionary["year"]
+            salary = vac.salary.salary_in_rur
+            DataSet.try_to_add(partial["area_to_sum"], vac.dictionary["area_name"], salary)
+            DataSet.try_to_add(partial["area_to_count"], vac.dictionary["area_name"], 1)
+            DataSet.try_to_add(partial["year_to_sum"], year, salary)
+            DataSet.try_to_add(partial["year_to_count"], year, 1)
+            if vac.is_needed:
+                DataSet.try_to_add(partial["year_to_sum_needed"], year, salary)
+                DataSet.try_to_add(partial["year_to_count_needed"], year, 1)
+    return partial
+
+
+def aggregate_batch(lines, start_line: list, professions: list) -> dict:
+    """Считает частичные суммы сразу для списка профессий. Названия вакансий проверяются одним
+    ProfessionMatcher, общие суммы по годам и городам считаются один раз.
+
+    Args:
+        lines (Iterable): Строки csv-файла без заголовка.
+        start_line (list): Заголовок csv-файла.
+        professions (list): Названия профессий.
+
+    Returns:
+        dict: Словарь профессия/частичные суммы, см. aggregate_lines.
+    """
+    matcher = ProfessionMatcher(professions)
+    shared = {key: {} for key in PARTIAL_KEYS if not key.endswith("_needed")}
+    needed = [({}, {}) for _ in professions]
+    for line in lines:
+        if not ("" in line) and len(line) == len(start_line):
+            new_dict_line = dict(zip(start_line, line))
+            new_dict_line["is_needed"] = None
+            vac = Vacancy(new_dict_line)
+            year = vac.dictionary["year"]
+            salary = vac.salary.salary_in_rur
+            DataSet.try_to_add(shared["area_to_sum"], vac.dictionary["area_name"], salary)
+            DataSet.try_to_add(shared["area_to_count"], vac.dictionary["area_name"], 1)
+            DataSet.try_to_add(shared["year_to_sum"], year, salary)
+            DataSet.try_to_add(shared["year_to_count"], year, 1)
+            for index in matcher.find(vac.dictionary["name"]):
+                DataSet.try_to_add(needed[index][0], year, salary)
+                DataSet.try_to_add(needed[index][1], year, 1)
+    return {profession: dict(shared, year_to_sum_needed=needed[i][0], year_to_count_needed=needed[i][1])
+            for i, profession in enumerate(professions)}
+
+
+def create_datasets(csv_dir: str, professions: list, file_name: str) -> dict:
+    """Считает статистику для списка профессий за один проход по файлу.
+
+    Args:
+        csv_dir (str): папка расположения всех csv-файлов.
+        professions (list): Названия профессий.
+        file_name (str): Название большого файла с данными.
+
+    Returns:
+        dict: Словарь профессия/DataSet.
+    """
+    start_line = read_header(file_name)[0]
+    with open(file_name, "r", encoding='utf-8-sig', newline='') as csv_file:
+        file = csv.reader(csv_file)
+        next(file)
+        partials = aggregate_batch(file, start_line, professions)
+    return {profession: DataSet(csv_dir, profession, file_name, partials=[partial])
+            for profession, partial in partials.items()}
+
+
+def create_reports(datasets: dict, file_name: str = "report_{}.pdf"):
+    """Создаёт pdf-отчёты для нескольких профессий. Графики всех отчётов рисуются на одной фигуре,
+    общие для всех профессий графики рисуются один раз. Готовые HTML-страницы сразу отправляются в пул
+    бэкенда pdf, поэтому pdf пишутся, пока рисуются графики следующих отчётов.
+
+    Args:
+        datasets (dict): Словарь профессия/DataSet, например из create_datasets.
+        file_name (str): Шаблон названия pdf-файла, {} заменяется профессией.
+
+    Returns:
+        list: Названия записанных pdf-файлов.
+    """
+    def get_pages(figure: ReportFigure):
+        for profession, data_set in datasets.items():
+            report = Report(data_set)
+            yield report.render_html(report.get_image_uri(figure=figure)), file_name.format(profession)
+
+    with ReportFigure((16, 9), pad_font_size=16) as figure:
+        return get_backend().write_many(get_pages(figure))
+
+
+def read_csv_shard(file_name: str, start: int, end: int, start_line: list, profession: str) -> dict:
+    """Читает диапазон байтов csv-файла и считает по нему частичные суммы (выполняется в отдельном процессе).
+
+    Args:
+        file_name (str): Название большого файла с данными.
+        start (int): Начало диапазона в байтах.
+        end (int): Конец диапазона в байтах.
+        start_line (list): Заголовок csv-файла.
+        profession (str): Название профессии.
+
+    Returns:
+        dict: Частичные суммы, см. aggregate_lines.
+    """
+    return aggregate_lines(read_shard(file_name, start, end), start_line, profession)
 
 
 def do_exit(message):
@@ -469,15 +876,16 @@ def do_exit(message):
     exit(0)
 
 
-def create_pdf(csv_dir: str, file_name: str):
+def create_pdf(csv_dir: str, file_name: str, mode: str = "chunks", workers: int = None):
     file_csv_name = input("Введите название файла: ")
     profession = input("Введите название профессии: ")
     start_time = time.time()
-    if os.path.exists(csv_dir):
-        import shutil
-        shutil.rmtree(csv_dir)
-    os.mkdir(csv_dir)
-    data_set = DataSet(csv_dir, profession, file_csv_name)
+    if mode == "chunks":
+        if os.path.exists(csv_dir):
+            import shutil
+            shutil.rmtree(csv_dir)
+        os.mkdir(csv_dir)
+    data_set = DataSet(csv_dir, profession, file_csv_name, mode, workers)
     report = Report(data_set)
     report.generate_pdf(file_name)
     print("done: " + str(time.time() - start_time))
@@ -1,17 +1,21 @@
+import datetime
 import decimal
-import requests
+import os
 import csv
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from itertools import repeat
+from http_session import create_session
+from date_parsing import parse_published_at
 
 
 currencies = ['USD', 'EUR', 'KZT', 'UAH', 'BYR']
-min_date = 2003, 1, 24, 21, 30, 49
-max_date = 2022, 7, 19, 11, 10, 32
+bank_url = 'http://www.cbr.ru/scripts/XML_daily.asp'
 
 
-def get_curency_from_bank(min_date, max_date):
+def get_months(min_date, max_date):
     """
-    Метод, который собирает курсы валют с помощью API сайта ЦБ РФ
+    Метод, перебирающий (год, месяц) от месяца min_date до месяца max_date включительно
 
     Attributes:
         min_date: крайняя минимальная дата
@@ -20,57 +24,171 @@ def get_curency_from_bank(min_date, max_date):
     for year in range(min_date[0], max_date[0] + 1):
         for month in range(1, 13):
             if year == max_date[0] and month > max_date[1]:
-                 break
+                break
             if year == min_date[0] and month < min_date[1]:
                 continue
-            request = requests.get(f'http://www.cbr.ru/scripts/XML_daily.asp?date_req=01/{month:02}/{year}')
-            with open(f'curency/01-{month}-{year}.xml','w') as request_file:
-                request_file.write(request.text)
+            yield year, month
 
-def do_split(i, sep, delete_empty = False, func = lambda x: x):
+
+def get_days(min_date, max_date):
+    """
+    Метод, перебирающий (год, месяц, день) от дня min_date до дня max_date включительно
+
+    Attributes:
+        min_date: крайняя минимальная дата
+        max_date: крайняя максимальная дата
+    """
+    day = datetime.date(*min_date[:3])
+    while day <= datetime.date(*max_date[:3]):
+        yield day.year, day.month, day.day
+        day += datetime.timedelta(days=1)
+
+
+def get_dates(min_date, max_date, daily=False):
+    """
+    Метод, перебирающий (год, месяц, день) запросов к ЦБ РФ: каждый день или 1-е число каждого месяца
+
+    Attributes:
+        min_date: крайняя минимальная дата
+        max_date: крайняя максимальная дата
+        daily: курсы за каждый день
+    """
+    if daily:
+        return list(get_days(min_date, max_date))
+    return [(year, month, 1) for year, month in get_months(min_date, max_date)]
+
+
+def get_cache_name(year, month, cache_dir='curency', day=1):
+    """
+    Метод, возвращающий имя файла, в котором хранится ответ ЦБ РФ за день (по умолчанию 1-е число месяца)
+
+    Attributes:
+        year: год
+        month: месяц
+        cache_dir: папка с ответами
+        day: день
+    """
+    return f'{cache_dir}/{day:02}-{month}-{year}.xml'
+
+
+def is_cached(file_name):
+    """
+    Метод, проверяющий, что ответ уже скачан целиком
+
+    Attributes:
+        file_name: имя файла с ответом
+    """
+    if not os.path.exists(file_name) or os.path.getsize(file_name) == 0:
+        return False
+    with open(file_name, 'rb') as file:
+        file.seek(max(os.path.getsize(file_name) - 64, 0))
+        return file.read().rstrip().endswith(b'</ValCurs>')
+
+
+def download_date(session, url, year, month, day=1, cache_dir='curency'):
+    """
+    Метод, скачивающий курсы за день в кеш. Файл появляется только после полной загрузки
+
+    Attributes:
+        session: сессия requests
+        url: адрес XML_daily.asp
+        year: год
+        month: месяц
+        day: день
+        cache_dir: папка с ответами
+    """
+    response = session.get(f'{url}?date_req={day:02}/{month:02}/{year}', timeout=30)
+    response.raise_for_status()
+    file_name = get_cache_name(year, month, cache_dir, day)
+    with open(file_name + '.tmp', 'wb') as request_file:
+        request_file.write(response.content)
+    os.replace(file_name + '.tmp', file_name)
+
+
+def get_curency_from_bank(min_date, max_date, url=bank_url, workers=8, cache_dir='curency', daily=False):
     """
-    Вспомогательный метод помогающий разбить время
+    Метод, который собирает курсы валют с помощью API сайта ЦБ РФ. Уже скачанные даты берутся из кеша,
+    остальные скачиваются параллельно в workers потоков через общий пул соединений
+
+    Attributes:
+        min_date: крайняя минимальная дата
+        max_date: крайняя максимальная дата
+        url: адрес XML_daily.asp (можно подменить на локальный сервер)
+        workers: количество одновременных запросов
+        cache_dir: папка с ответами
+        daily: курсы за каждый день, а не за 1-е число месяца
+
+    Returns:
+        list: (год, месяц, день), которые пришлось скачать
     """
-    results = []
-    temp = ''
-    for element in i:
-        if element in sep:
-            if (delete_empty and temp != '') or not delete_empty:
-                results.append(func(temp))
-            temp = ''
+    os.makedirs(cache_dir, exist_ok=True)
+    missing = [(year, month, day) for year, month, day in get_dates(min_date, max_date, daily)
+               if not is_cached(get_cache_name(year, month, cache_dir, day))]
+    with create_session(workers) as session, ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda date: download_date(session, url, *date, cache_dir), missing))
+    return missing
+
+def read_valutes(file_name):
+    """
+    Метод, за один проход iterparse собирающий из файла ЦБ РФ все валюты: CharCode -> (Value, Nominal)
+
+    Attributes:
+        file_name: имя файла с ответом
+    """
+    valutes = dict()
+    for _, element in ET.iterparse(file_name):
+        if element.tag == 'Valute':
+            valutes.setdefault(element.findtext('CharCode'), (element.findtext('Value'), element.findtext('Nominal')))
+            element.clear()
+    return valutes
+
+
+def get_date_row(year, month, day, currencies, daily=False, cache_dir='curency'):
+    """
+    Метод формирующий строку complite.csv за месяц (или день): курс за единицу каждой валюты или '', если её нет
+
+    Attributes:
+        year: год
+        month: месяц
+        day: день
+        currencies: массив валют (RUR, USD...)
+        daily: записать дату как YYYY-MM-DD, иначе YYYY-MM
+        cache_dir: папка с ответами
+    """
+    valutes = read_valutes(get_cache_name(year, month, cache_dir, day))
+    row = [f'{year}-{month:02}-{day:02}' if daily else f'{year}-{month:02}']
+    for curr in currencies:
+        if curr in valutes:
+            value, nominal = valutes[curr]
+            row.append(decimal.Decimal(value.replace(',', '.')) / int(nominal))
         else:
-            temp += element
-    results.append(func(temp))
-    return results
+            row.append('')
+    return row
+
 
-def complite_curency_from_bank(currencies, min_date, max_date):
+def complite_curency_from_bank(currencies, min_date, max_date, workers=None, daily=False, file_name='complite.csv',
+                               cache_dir='curency'):
     """
-    Метод формирующий dataframe
+    Метод формирующий dataframe. Файлы разбираются параллельно в workers процессов,
+    complite.csv записывается одним буферизованным writerows
 
     Attributes:
         currencies: массив валют (RUR, USD...)
         min_date: крайняя минимальная дата
         max_date: крайняя максимальная дата
+        workers: количество процессов, по умолчанию - количество ядер
+        daily: строка на каждый день (YYYY-MM-DD), иначе на каждый месяц (YYYY-MM)
+        file_name: имя итогового csv-файла
+        cache_dir: папка с ответами (та же, что в get_curency_from_bank)
     """
-    with open('complite.csv', 'w', encoding='utf-8', newline='') as file:
+    years, months, days = zip(*get_dates(min_date, max_date, daily))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        rows = list(executor.map(get_date_row, years, months, days, repeat(currencies), repeat(daily),
+                                 repeat(cache_dir), chunksize=16))
+    with open(file_name, 'w', encoding='utf-8', newline='', buffering=1 << 20) as file:
         writer = csv.writer(file)
         writer.writerow(['date'] + currencies)
-        for year in range(min_date[0], max_date[0] + 1):
-            for month in range(1, 13):
-                if year == max_date[0] and month > max_date[1]:
-                    break
-                if year == min_date[0] and month < min_date[1]:
-                    continue
-                tree = ET.parse(f'curency/01-{month}-{year}.xml')
-                row = [f'{year}-{month:02}']
-                for curr in currencies:
-                    value = tree.find(f"Valute[CharCode='{curr}']/Value")
-                    if value != None:
-                        row.append(decimal.Decimal(value.text.replace(',', '.')) / int(
-                            tree.find(f"Valute[CharCode='{curr}']/Nominal").text))
-                    else:
-                        row.append('')
-                writer.writerow(row)
+        writer.writerows(rows)
 
 def get_min_max_date(filename, lower_limit=5000):
     """
@@ -86,7 +204,7 @@ def get_min_max_date(filename, lower_limit=5000):
             if row[3] not in res_dict:
                 res_dict[row[3]] = 0
             res_dict[row[3]] += 1
-            date = tuple(do_split(row[5], '-T:+', True, int)[:-1])
+            date = parse_published_at(row[5])
             if date < min_date:
                 min_date = date
             if date > max_date:
@@ -94,5 +212,8 @@ def get_min_max_date(filename, lower_limit=5000):
 
     return list(filter(lambda x: res_dict[x] > lower_limit, res_dict)), min_date, max_date
 
-get_curency_from_bank(min_date, max_date)
-complite_curency_from_bank(currencies, min_date, max_date)
\ No newline at end of file
+
+if __name__ == '__main__':
+    _, min_date, max_date = get_min_max_date('vacancies_dif_currencies.csv')
+    get_curency_from_bank(min_date, max_date)
+    complite_curency_from_bank(currencies, min_date, max_date)
@@ -1,50 +1,106 @@
 import csv
+import math
+import time
+from itertools import islice
+from currency_rates import RateTable
+from date_parsing import decode_published_at, to_days
 
 
 filename = 'vacancies_dif_currencies.csv'
-complite = dict()
+batch_size = 10000
 
 
-with open('complite.csv', encoding='utf-8') as file:
-    reader = csv.reader(file)
-    complite_title = next(reader)
-    for line in reader:
-        complite[tuple(line[0].split('-'))] = {element: i for element, i in zip(complite_title, line)}
+def read_batches(reader, size=batch_size):
+    """
+    Генератор, отдающий строки csv пачками по size штук: в памяти одновременно лежит одна пачка
 
+    Attributes:
+        reader: csv.reader, заголовок уже прочитан
+        size: количество строк в пачке
+    """
+    while True:
+        batch = list(islice(reader, size))
+        if not batch:
+            return
+        yield batch
 
-with open(filename, encoding='utf-8-sig') as complite_file, open('result.csv', 'w', encoding='utf-8-sig', newline='') as result_file:
-    writer = csv.writer(result_file)
-    reader = csv.reader(complite_file)
-    title = next(reader)
-    new_title = title[::]
+
+def get_result_title(title):
+    """
+    Метод, формирующий заголовок result.csv: salary_from заменяется на salary, salary_to и salary_currency убираются
+
+    Attributes:
+        title: заголовок исходного файла
+    """
+    new_title = [element for element in title if element not in ('salary_to', 'salary_currency')]
     new_title[new_title.index('salary_from')] = 'salary'
-    new_title.remove('salary_to').remove('salary_currency')
-    writer.writerow(new_title)
-
-    for row in reader:
-        dict = {element: i for element, i in zip(title, row)}
-        year, month = dict['published_at'].split('-')[:2]
-        currency_value = complite[year, month]
-        new_row = []
-        salary = ''
-        if (dict['salary_from'] != '' or dict['salary_to'] != '') and (dict['salary_currency'] == "RUR"
-            or (dict['salary_currency'] in currency_value and currency_value[dict['salary_currency']] != '')):
-            salary, count = 0, 0
-            if dict['salary_from'] != '':
-                salary += float(dict['salary_from'])
-                count += 1
-            if dict['salary_to'] != '':
-                salary += float(dict['salary_to'])
-                count += 1
-            currency = dict['salary_currency']
-            if currency != 'RUR':
-                salary *= float(currency_value[currency])
-            salary //= count
-
-        for element in new_title:
-            if element == 'salary':
-                new_row.append(salary)
-            else:
-                new_row.append(dict[element])
-
-        writer.writerow(new_row)
\ No newline at end of file
+    return new_title
+
+
+def convert_batches(batches, title, complite):
+    """
+    Генератор, переводящий зарплаты пачки в рубли. Курсы на день публикации берутся для всей пачки одной выборкой,
+    столбцы строк берутся по индексам
+
+    Attributes:
+        batches: пачки строк исходного файла
+        title: заголовок исходного файла
+        complite: таблица курсов RateTable
+    """
+    salary_from, salary_to = title.index('salary_from'), title.index('salary_to')
+    salary_currency, published_at = title.index('salary_currency'), title.index('published_at')
+    columns = [title.index(element) if element != 'salary' else None for element in get_result_title(title)]
+    for batch in batches:
+        days = to_days(*decode_published_at([row[published_at] for row in batch]))
+        rates = complite.get_rates(days, [row[salary_currency] for row in batch])
+        result = []
+        for row, rate in zip(batch, rates):
+            salary = ''
+            if (row[salary_from] != '' or row[salary_to] != '') \
+                    and (row[salary_currency] == 'RUR' or not math.isnan(rate)):
+                salary, count = 0, 0
+                if row[salary_from] != '':
+                    salary += float(row[salary_from])
+                    count += 1
+                if row[salary_to] != '':
+                    salary += float(row[salary_to])
+                    count += 1
+                if row[salary_currency] != 'RUR':
+                    salary *= rate
+                salary //= count
+            result.append([salary if i is None else row[i] for i in columns])
+        yield result
+
+
+def convert_file(file_name=filename, result_name='result.csv', complite_name='complite.csv', size=batch_size):
+    """
+    Метод, переводящий зарплаты файла в рубли по курсам complite.csv: чтение, перевод и запись идут пачками,
+    каждая пачка записывается одним writerows в буферизованный файл
+
+    Attributes:
+        file_name: исходный csv-файл
+        result_name: итоговый csv-файл
+        complite_name: csv-файл с курсами
+        size: количество строк в пачке
+
+    Returns:
+        (int, float): количество строк и время работы в секундах
+    """
+    start = time.perf_counter()
+    complite = RateTable.from_csv(complite_name)
+    rows = 0
+    with open(file_name, encoding='utf-8-sig', newline='') as complite_file, \
+            open(result_name, 'w', encoding='utf-8-sig', newline='', buffering=1 << 20) as result_file:
+        reader = csv.reader(complite_file)
+        writer = csv.writer(result_file)
+        title = next(reader)
+        writer.writerow(get_result_title(title))
+        for result in convert_batches(read_batches(reader, size), title, complite):
+            writer.writerows(result)
+            rows += len(result)
+    return rows, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    rows, seconds = convert_file()
+    print(f'{rows} строк за {seconds:.2f} с ({rows / max(seconds, 1e-9):.0f} строк/с)')
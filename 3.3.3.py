@@ -1,6 +1,18 @@
-import csv, requests, json, time
+import asyncio
+import csv
+import io
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from datetime import datetime, timedelta
+from http_session import create_session
 
 
+api_url = 'https://api.hh.ru'
+time_format = '%Y-%m-%dT%H:%M:%S%z'
+max_found = 2000
+title = ['name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at']
 template = {
         'page': 0,
         'per_page': 100,
@@ -12,50 +24,190 @@ dates_from = ['2022-12-26T00:00:00+0300', '2022-12-26T06:00:00+0300', '2022-12-2
 dates_to = ['2022-12-26T06:00:00+0300', '2022-12-26T12:00:00+0300', '2022-12-26T18:00:00+0300', '2022-12-26T23:59:59+0300']
 
 
-def get_vacancies(template):
+class TokenBucket:
     """
-    Метод получающий из API HH (https://api.hh.ru/) все IT-вакансии за любой прошедший будний день текущего месяца
+    Класс ограничения частоты запросов: в среднем не больше rate запросов в секунду, всплеск до capacity запросов
 
     Attributes:
-        template (dict): шаблон выгрузки
-    """
-    api_url = 'https://api.hh.ru'
-    request = requests.get(f'{api_url}/vacancies', template)
-    if request.status_code != 200:
-        for i in range(100):
-            time.sleep(0.3)
-            request = requests.get(f'{api_url}/vacancies', template)
-            if request.status_code == 200:
-                break
-            else:
-                if 'captha' in request.content.decode():
-                    print(request.content.decode())
-                    input()
-    data = request.content.decode()
-    request.close()
-    return data
-
-
-with open('26-12-2022.csv', 'w',encoding='utf-8', newline='') as file:
-    writer = csv.writer(file)
-    title = ['name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at']
-    writer.writerow(title)
-
-    for i in range(4):
-        template['date_to'], template['date_from'] = dates_to[i], dates_from[i]
-        for page in range(20):
-            template['page'] = page
-            jsn = json.loads(get_vacancies(template))
-            for dict in jsn['items']:
-                row = [dict['name']]
-                if dict['salary'] == None:
-                    row.extend([None, None, None])
-                else:
-                    row.extend([dict['salary']['from'], dict['salary']['to'], dict['salary']['currency']])
-                if dict['area'] == None:
-                    row.append(None)
-                else:
-                    row.append(dict['area']['name'])
-                row.append(dict['published_at'])
-                writer.writerow(row)
-            time.sleep(0.25)
\ No newline at end of file
+        rate (float): запросов в секунду
+        capacity (int): размер всплеска
+    """
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        """
+        Метод, ожидающий, пока в корзине появится маркер, и забирающий его
+        """
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def get_rows(items):
+    """
+    Метод, превращающий вакансии из ответа API в строки csv. Отсутствующие salary и area заменяются пустым словарём,
+    поэтому поля берутся без отдельных проверок на None
+
+    Attributes:
+        items (list): вакансии страницы (поле items)
+    """
+    empty = {}
+    rows = []
+    for item in items:
+        salary = item['salary'] or empty
+        area = item['area'] or empty
+        rows.append((item['name'], salary.get('from'), salary.get('to'), salary.get('currency'), area.get('name'),
+                     item['published_at']))
+    return rows
+
+
+def flatten_page(content):
+    """
+    Метод, разбирающий сырой ответ API (байты) прямо в текст csv. Выполняется в процессе пула, поэтому разбор json
+    и кодирование csv не задерживают цикл событий
+
+    Attributes:
+        content (bytes): тело ответа
+
+    Returns:
+        (int, int, str): количество найденных вакансий, количество страниц, строки csv
+    """
+    data = json.loads(content)
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(get_rows(data['items']))
+    return data['found'], data['pages'], buffer.getvalue()
+
+
+class VacancyHarvester:
+    """
+    Класс выгрузки вакансий из API HH (https://api.hh.ru/). Окна времени выгружаются параллельно через общий пул
+    соединений, частота запросов ограничена TokenBucket. Окно, в котором найдено больше max_found вакансий,
+    делится пополам. Выгруженные окна записываются в файл контрольной точки, прерванная выгрузка продолжается с них
+
+    Attributes:
+        file_name (str): итоговый csv-файл
+        url (str): адрес API (можно подменить на локальный сервер)
+        rate (float): запросов в секунду
+        workers (int): количество одновременных запросов
+        flatten_workers (int): количество процессов разбора страниц, по умолчанию - количество ядер
+        checkpoint_name (str): файл контрольной точки
+        min_window (timedelta): окно, которое уже не делится
+    """
+    def __init__(self, file_name, url=api_url, rate=5, workers=8, flatten_workers=None, checkpoint_name=None,
+                 min_window=timedelta(minutes=1)):
+        self.file_name = file_name
+        self.url = url
+        self.workers = workers
+        self.flatten_workers = flatten_workers
+        self.bucket = TokenBucket(rate, capacity=workers)
+        self.checkpoint_name = checkpoint_name or file_name + '.checkpoint.json'
+        self.min_window = min_window
+        self.done = set()
+        if os.path.exists(self.checkpoint_name):
+            with open(self.checkpoint_name, encoding='utf-8') as file:
+                self.done = set(json.load(file)['done'])
+
+    def save_checkpoint(self):
+        """
+        Метод, атомарно сохраняющий список выгруженных окон
+        """
+        with open(self.checkpoint_name + '.tmp', 'w', encoding='utf-8') as file:
+            json.dump({'file': self.file_name, 'done': sorted(self.done)}, file)
+        os.replace(self.checkpoint_name + '.tmp', self.checkpoint_name)
+
+    def get_page(self, params):
+        """
+        Метод, выполняющий запрос страницы в потоке пула и возвращающий тело ответа без декодирования.
+        Капча проверяется только в ответе с ошибкой: в успешной странице это слово может быть в названии вакансии
+
+        Attributes:
+            params (dict): параметры запроса
+        """
+        response = self.session.get(f'{self.url}/vacancies', params=params, timeout=30)
+        if not response.ok and b'captcha' in response.content:
+            raise RuntimeError(f'API требует капчу: {response.text}')
+        response.raise_for_status()
+        return response.content
+
+    async def fetch_page(self, date_from, date_to, page):
+        """
+        Метод, запрашивающий страницу окна и разбирающий её в пуле процессов, не блокируя цикл событий
+
+        Attributes:
+            date_from (datetime): начало окна
+            date_to (datetime): конец окна
+            page (int): номер страницы
+        """
+        params = dict(template, page=page, date_from=date_from.strftime(time_format),
+                      date_to=date_to.strftime(time_format))
+        await self.bucket.acquire()
+        loop = asyncio.get_running_loop()
+        content = await loop.run_in_executor(self.executor, self.get_page, params)
+        return await loop.run_in_executor(self.flatteners, flatten_page, content)
+
+    async def harvest_window(self, date_from, date_to):
+        """
+        Метод, выгружающий все вакансии окна. Если вакансий больше max_found, окно делится пополам
+        и половины выгружаются параллельно
+
+        Attributes:
+            date_from (datetime): начало окна
+            date_to (datetime): конец окна
+        """
+        key = f'{date_from.strftime(time_format)}/{date_to.strftime(time_format)}'
+        if key in self.done:
+            return
+        found, pages, text = await self.fetch_page(date_from, date_to, 0)
+        if found > max_found and date_to - date_from > self.min_window:
+            middle = date_from + (date_to - date_from) / 2
+            middle -= timedelta(microseconds=middle.microsecond)
+            await asyncio.gather(self.harvest_window(date_from, middle),
+                                 self.harvest_window(middle + timedelta(seconds=1), date_to))
+        else:
+            if found > max_found:
+                print(f'{key}: найдено {found}, выгружено только {max_found}')
+            pages = min(pages, max_found // template['per_page'])
+            rest = await asyncio.gather(*(self.fetch_page(date_from, date_to, page) for page in range(1, pages)))
+            self.file.write(text)
+            for _, _, page_text in rest:
+                self.file.write(page_text)
+            self.file.flush()
+        self.done.add(key)
+        self.save_checkpoint()
+
+    async def harvest(self, windows):
+        """
+        Метод, выгружающий вакансии за все окна. Если есть контрольная точка, строки дописываются в файл,
+        после успешной выгрузки контрольная точка удаляется
+
+        Attributes:
+            windows (list): пары (начало, конец) окон
+        """
+        resume = bool(self.done) and os.path.exists(self.file_name)
+        with open(self.file_name, 'a' if resume else 'w', encoding='utf-8', newline='', buffering=1 << 20) as file, \
+                create_session(self.workers) as session, ThreadPoolExecutor(max_workers=self.workers) as executor, \
+                ProcessPoolExecutor(max_workers=self.flatten_workers) as flatteners:
+            self.file, self.session, self.executor, self.flatteners = file, session, executor, flatteners
+            if not resume:
+                self.done.clear()
+                csv.writer(file).writerow(title)
+            await asyncio.gather(*(self.harvest_window(date_from, date_to) for date_from, date_to in windows))
+        if os.path.exists(self.checkpoint_name):
+            os.remove(self.checkpoint_name)
+
+
+if __name__ == '__main__':
+    windows = [(datetime.strptime(date_from, time_format), datetime.strptime(date_to, time_format))
+               for date_from, date_to in zip(dates_from, dates_to)]
+    asyncio.run(VacancyHarvester('26-12-2022.csv').harvest(windows))
@@ -1,45 +1,36 @@
-import pandas as pd
-import csv
+import numpy as np
+from csv_cache import read_vacancies
+from currency_rates import RateTable
+from date_parsing import decode_published_at, to_days
 
 
-complite = dict()
+rates = RateTable.from_csv('complite.csv')
 
 
-with open('complite.csv', encoding='utf-8') as file:
-    reader = csv.reader(file)
-    compile_head = next(reader)
-    for line in reader:
-        complite[tuple(line[0].split('-'))] = {element: i for element, i in zip(compile_head, line)}
-
-
-def get_salary(salary_from, salary_to, salary_currency, published_at):
+def get_salary(result):
     """
-    Метод обработает данные из колонок ‘salary_from’, ‘salary_to’, ‘salary_currency’ исходя из правил прописанных в ТЗ
+    Метод обработает данные из колонок ‘salary_from’, ‘salary_to’, ‘salary_currency’ исходя из правил прописанных в ТЗ.
+    Курс на день публикации берётся одной выборкой из таблицы курсов rates, средняя зарплата считается
+    по маскам заполненных границ вилки сразу для всех строк
 
     Attributes:
-        salary_from: Нижняя предел вилки оклада
-        salary_to: Верхний предел вилки оклада
-        salary_currency: В какой валюте
-        published_at: Время публикации
+        result: DataFrame с колонками salary_from, salary_to, salary_currency, published_at (пропуски заполнены 0)
     """
-    year, month = published_at.split('T')[0].split('-')[:2]
-    if (salary_to == 0 and salary_from == 0) or (year, month) not in complite or salary_currency == '':
-        return None
-    dictionary = complite[year, month]
-    if salary_currency not in dictionary or dictionary[salary_currency] == '':
-        return None
-    salary, count = 0, 0
-    if salary_from != 0:
-        salary += salary_from
-        count += 1
-    if salary_to != 0:
-        salary += salary_to
-        count += 1
-    if salary_currency != 'RUR':
-        salary *= float(dictionary[salary_currency])
-    return salary // count
-
-result = pd.read_csv('vacancies_dif_currencies.csv', encoding='utf-8-sig').fillna(0)
-result['salary'] = result.apply(lambda row: get_salary(row['salary_from'], row['salary_to'], row['salary_currency'], row['published_at']), axis=1)
+    days = to_days(*decode_published_at(result['published_at']))
+    rate = rates.get_rates(days, result['salary_currency'].astype(str).to_numpy())
+    salary_from = result['salary_from'].to_numpy(dtype=float)
+    salary_to = result['salary_to'].to_numpy(dtype=float)
+    has_from, has_to = salary_from != 0, salary_to != 0
+    salary = np.where(has_from, salary_from, 0) + np.where(has_to, salary_to, 0)
+    is_valid = (has_from | has_to) & ~np.isnan(rate)
+    rate = np.where(result['salary_currency'].to_numpy() == 'RUR', 1.0, rate)
+    count = has_from.astype(int) + has_to
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(is_valid, np.floor_divide(salary * rate, count), np.nan)
+
+result = read_vacancies('vacancies_dif_currencies.csv')
+result['area_name'] = result['area_name'].cat.add_categories([0])
+result = result.fillna(0)
+result['salary'] = get_salary(result)
 with open('3.4.1_full.csv', 'w', encoding='utf-8-sig', newline='') as file:
-    result[['name', 'salary', 'area_name', 'published_at']].to_csv(file, index=False)
\ No newline at end of file
+    result[['name', 'salary', 'area_name', 'published_at']].to_csv(file, index=False)
@@ -1,30 +1,144 @@
 import pandas as pd
-from jinja2 import Environment, FileSystemLoader
-import pdfkit
+from csv_cache import read_vacancies
+from profession_matcher import ProfessionMatcher
+from name_index import get_name_mask
+from vacancy_cube import VacancyCube
+from pdf_backends import get_backend
+from template_registry import get_template
+
+
+def scan_statistics(filename, vacancy_name):
+    """
+    Метод считающий статистику по годам по всему файлу. Маска профессии считается один раз (по NameIndex,
+    если он построен), все четыре статистики - одной группировкой по году
+
+    Attributes:
+        filename: Название файла
+        vacancy_name: Название вакансии
+    """
+    result = read_vacancies(filename)
+    selected = get_name_mask(filename, result['name'], vacancy_name)
+    result = result\
+            .dropna()\
+            .assign(salary=lambda x: x['salary'].astype('int64'))
+    selected = pd.Series(selected[result.index], index=result.index)
+    return result[['year', 'salary']]\
+        .assign(selected=selected, selected_salary=result['salary'].where(selected))\
+        .groupby('year')\
+        .agg(salary=('salary', 'mean'), count=('salary', 'count'),
+             selected_salary=('selected_salary', 'mean'), selected_count=('selected', 'sum'))
+
+
+def get_cube_statistics(cube, vacancy_name):
+    """
+    Метод считающий статистику по годам по кубу VacancyCube без чтения файла
+
+    Attributes:
+        cube: Куб вакансий, в котором есть профессия vacancy_name
+        vacancy_name: Название вакансии
+    """
+    statistic = cube.get_years()
+    selected = cube.get_years(vacancy_name).reindex(statistic.index)
+    return pd.DataFrame({'salary': statistic['mean'], 'count': statistic['count'],
+                         'selected_salary': selected['mean'],
+                         'selected_count': selected['count'].fillna(0).astype('int64')})
 
 
 def get_statistics(filename, vacancy_name):
     """
-    Метод обрабатывающий полученную базу данных исходя из названия полученной вакансии, формирует pdf с полученными результатами
+    Метод обрабатывающий полученную базу данных исходя из названия полученной вакансии, формирует pdf с полученными результатами.
+    Если для файла построен куб с этой профессией, статистика берётся из куба, иначе файл читается целиком
 
     Attributes:
         filename: Название файла
         vacancy_name: Название вакансии
     """
-    result = pd.read_csv(filename, encoding='utf-8-sig')\
+    cube = VacancyCube.load(filename)
+    if cube is not None and cube.has_profession(vacancy_name):
+        statistic = get_cube_statistics(cube, vacancy_name)
+    else:
+        statistic = scan_statistics(filename, vacancy_name)
+    salary_statistic = statistic['salary'].round().to_dict()
+    selected_salary_statistic = statistic['selected_salary'].fillna(0).round().to_dict()
+    count_statistic = statistic['count'].to_dict()
+    selected_count_statistic = statistic['selected_count'].to_dict()
+    header = ['Года',
+              'Динамика уровня зарплат по годам',
+              'Динамика уровня зарплат по годам для выбранной профессии',
+              'Динамика количества вакансий по годам',
+              'Динамика количества вакансий по годам для выбранной профессии']
+    write_pdf(header, salary_statistic, selected_salary_statistic, count_statistic, selected_count_statistic, '3.4.2.pdf')
+
+
+def get_statistics_batch(filename, vacancy_names):
+    """
+    Метод формирующий pdf для каждой вакансии из списка за одно чтение файла. Названия вакансий проверяются
+    одним ProfessionMatcher по уникальным названиям, статистика всех вакансий считается одной группировкой
+
+    Attributes:
+        filename: Название файла
+        vacancy_names: Список названий вакансий
+    """
+    result = read_vacancies(filename)\
             .dropna()\
             .assign(salary=lambda x: x['salary'].astype('int64'),
-                    area_name=lambda x: x['area_name'].astype('category'))\
-            .assign(year=lambda x: x.apply(lambda y: y['published_at'].split('T')[0].split('-')[0], axis=1))
-    salary_statistic = result[['year', 'salary']].groupby('year').mean().round().to_dict()['salary']
-    selected_salary_statistic = result[result.name.apply(lambda x: vacancy_name.lower() in x.lower())][['year', 'salary']].groupby('year').mean().round().to_dict()['salary']
-    count_statistic = result.groupby('year').count().to_dict()['salary']
-    selected_count_statistic = result[result.name.apply(lambda x: vacancy_name.lower() in x.lower())].groupby('year').count().to_dict()['salary']
+                    name=lambda x: x['name'].astype('category'))
+    statistic = result.groupby('year')['salary'].agg(['mean', 'count'])
+    salary_statistic = statistic['mean'].round().to_dict()
+    count_statistic = statistic['count'].to_dict()
+    matcher = ProfessionMatcher(vacancy_names, ignore_case=True)
+    matches = pd.Series([matcher.find(name) for name in result.name.cat.categories])
+    selected = result[['year', 'salary']]\
+        .assign(vacancy=matches[result.name.cat.codes].values)\
+        .explode('vacancy')\
+        .dropna(subset=['vacancy'])\
+        .groupby(['vacancy', 'year'])['salary'].agg(['mean', 'count'])
     header = ['Года',
               'Динамика уровня зарплат по годам',
               'Динамика уровня зарплат по годам для выбранной профессии',
               'Динамика количества вакансий по годам',
               'Динамика количества вакансий по годам для выбранной профессии']
+
+    def get_pages():
+        for i, vacancy_name in enumerate(vacancy_names):
+            vacancy = selected.xs(i, level='vacancy') if i in selected.index.get_level_values('vacancy') else selected.iloc[:0]
+            selected_salary_statistic = vacancy['mean'].round().to_dict()
+            selected_count_statistic = vacancy['count'].to_dict()
+            html = render_html(header, salary_statistic,
+                               {year: selected_salary_statistic.get(year, 0) for year in salary_statistic},
+                               count_statistic, {year: selected_count_statistic.get(year, 0) for year in salary_statistic})
+            yield html, f'3.4.2_{vacancy_name}.pdf'
+
+    get_backend().write_many(get_pages())
+
+
+def write_pdf(header, salary_statistic, selected_salary_statistic, count_statistic, selected_count_statistic, pdf_name):
+    """
+    Метод формирующий pdf по статистике по годам
+
+    Attributes:
+        header: Заголовки столбцов
+        salary_statistic: Год/средняя зарплата
+        selected_salary_statistic: Год/средняя зарплата для выбранной профессии
+        count_statistic: Год/количество вакансий
+        selected_count_statistic: Год/количество вакансий для выбранной профессии
+        pdf_name: Название pdf-файла
+    """
+    get_backend().write(render_html(header, salary_statistic, selected_salary_statistic, count_statistic,
+                                    selected_count_statistic), pdf_name)
+
+
+def render_html(header, salary_statistic, selected_salary_statistic, count_statistic, selected_count_statistic):
+    """
+    Метод заполняющий html-шаблон статистикой по годам
+
+    Attributes:
+        header: Заголовки столбцов
+        salary_statistic: Год/средняя зарплата
+        selected_salary_statistic: Год/средняя зарплата для выбранной профессии
+        count_statistic: Год/количество вакансий
+        selected_count_statistic: Год/количество вакансий для выбранной профессии
+    """
     dictionary = dict()
     for year in salary_statistic:
         dictionary[year] = dict()
@@ -34,13 +148,11 @@ def get_statistics(filename, vacancy_name):
         dictionary[year][header[3]] = count_statistic[year]
         dictionary[year][header[4]] = selected_count_statistic[year]
 
-    env = Environment(loader=FileSystemLoader('.'))
-    template = env.get_template("3.4.2_template.html").render({'header': header, 'dictionary': dictionary})
-    config = pdfkit.configuration(wkhtmltopdf=r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe')
-    pdfkit.from_string(template, '3.4.2.pdf', configuration=config)
+    return get_template("3.4.2_template.html").render({'header': header, 'dictionary': dictionary})
 
 
-filename = input()
-vacancy_name = input()
+if __name__ == '__main__':
+    filename = input()
+    vacancy_name = input()
 
-get_statistics(filename, vacancy_name)
+    get_statistics(filename, vacancy_name)
@@ -1,64 +1,158 @@
 import pandas as pd
-import pdfkit
-from jinja2 import Environment, FileSystemLoader
+from csv_cache import read_vacancies
+from name_index import get_name_mask
+from vacancy_cube import VacancyCube
+from pdf_backends import get_backend
+from template_registry import get_template
+
+
+title_1 = ['Год',
+           'Динамика уровня зарплат по годам для выбранной профессии и региона',
+           'Динамика количества вакансий по годам для выбранной профессии и региона']
+
+title_2 = ['Город', 'Зарплата по городу', 'Доля вакансий по городам']
+
+
+def read_stats(filename, vacancy_name):
+    """
+    Метод читающий базу данных и считающий маску выбранной профессии и названия городов в нижнем регистре.
+    Названия переводятся в нижний регистр по категориям, а не по строкам, профессия ищется по NameIndex, если он построен
+
+    Attributes:
+        filename: Название файла
+        vacancy_name: Название вакансии
+    """
+    result = read_vacancies(filename)
+    selected = get_name_mask(filename, result['name'], vacancy_name)
+    result = result.dropna()
+    areas = result['area_name'].cat.categories.str.lower()[result['area_name'].cat.codes]
+    selected = pd.Series(selected[result.index], index=result.index)
+    return result, areas, selected
+
+
+def group_by_area(result):
+    """
+    Метод считающий количество вакансий и среднюю зарплату по городам одной группировкой
+
+    Attributes:
+        result: Вакансии
+    """
+    return result.groupby('area_name', observed=True)['salary'].agg(['count', 'mean'])
+
+
+def group_by_year(selected):
+    """
+    Метод считающий среднюю зарплату и количество вакансий по годам одной группировкой
+
+    Attributes:
+        selected: Вакансии выбранной профессии и города
+    """
+    return selected.groupby('year')['salary'].agg(['mean', 'count'])
+
+
+def get_area_statistic(by_area, total):
+    """
+    Метод формирующий таблицу 10 городов с наибольшей зарплатой среди городов, где больше 1% вакансий
+
+    Attributes:
+        by_area: Город/количество вакансий и средняя зарплата
+        total: Количество всех вакансий
+    """
+    by_area = by_area[by_area['count'] > total // 100].sort_values('mean', ascending=False).head(10)
+    salary_by_area = by_area['mean'].round(2).to_dict()
+    distribution_by_area = (by_area['count'] / total).round(3).to_dict()
+    return {area: {title_2[0]: area, title_2[1]: salary_by_area[area], title_2[2]: distribution_by_area[area]}
+            for area in salary_by_area}
+
+
+def get_year_statistic(by_year):
+    """
+    Метод формирующий таблицу по годам
+
+    Attributes:
+        by_year: Год/средняя зарплата и количество вакансий
+    """
+    return {year: {title_1[0]: year, title_1[1]: salary, title_1[2]: count}
+            for year, salary, count in zip(by_year.index, by_year['mean'].round(), by_year['count'])}
 
 
 def get_stats(filename, vacancy_name, area_name):
     """
-    Метод обрабатывающий полученную базу данных исходя из названия полученной вакансии и города, формирует pdf с полученными результатами
+    Метод обрабатывающий полученную базу данных исходя из названия полученной вакансии и города, формирует pdf с полученными результатами.
+    Если для файла построен куб с этой профессией, статистика берётся из куба, иначе файл читается целиком
 
     Attributes:
         filename: Название файла
         vacancy_name: Название вакансии
         area_name: Название города
     """
+    cube = VacancyCube.load(filename)
+    if cube is not None and cube.has_profession(vacancy_name):
+        dictionary_area = get_area_statistic(cube.get_areas(), cube.get_total())
+        dictionary_year = get_year_statistic(cube.get_years(vacancy_name, area_name))
+    else:
+        result, areas, selected = read_stats(filename, vacancy_name)
+        dictionary_area = get_area_statistic(group_by_area(result), len(result))
+        dictionary_year = get_year_statistic(group_by_year(result[selected & (areas == area_name.lower())]))
+    write_pdf(dictionary_area, dictionary_year, '3.4.3.pdf')
+
+
+def get_stats_batch(filename, vacancy_name, area_names):
+    """
+    Метод формирующий pdf для каждого города из списка за одно чтение файла (или куба). Таблица городов общая,
+    статистика по годам для всех городов считается одной группировкой по городу и году
+
+    Attributes:
+        filename: Название файла
+        vacancy_name: Название вакансии
+        area_names: Список названий городов
+    """
+    cube = VacancyCube.load(filename)
+    if cube is not None and cube.has_profession(vacancy_name):
+        dictionary_area = get_area_statistic(cube.get_areas(), cube.get_total())
+        pages = ((render_html(dictionary_area, get_year_statistic(cube.get_years(vacancy_name, area_name))),
+                  f'3.4.3_{area_name}.pdf') for area_name in area_names)
+    else:
+        result, areas, selected = read_stats(filename, vacancy_name)
+        dictionary_area = get_area_statistic(group_by_area(result), len(result))
+        by_area = result[selected].assign(area=areas[selected.to_numpy()]).groupby(['area', 'year'])['salary']\
+            .agg(['mean', 'count'])
+
+        def get_by_year(area):
+            return by_area.xs(area, level='area') if area in by_area.index.get_level_values('area') else by_area.iloc[:0]
+
+        pages = ((render_html(dictionary_area, get_year_statistic(get_by_year(area_name.lower()))),
+                  f'3.4.3_{area_name}.pdf') for area_name in area_names)
+    get_backend().write_many(pages)
+
+
+def write_pdf(dictionary_area, dictionary_year, pdf_name):
+    """
+    Метод формирующий pdf по статистике по годам и по городам
+
+    Attributes:
+        dictionary_area: Город/строка таблицы по городам
+        dictionary_year: Год/строка таблицы по годам
+        pdf_name: Название pdf-файла
+    """
+    get_backend().write(render_html(dictionary_area, dictionary_year), pdf_name)
+
+
+def render_html(dictionary_area, dictionary_year):
+    """
+    Метод заполняющий html-шаблон статистикой по годам и по городам
+
+    Attributes:
+        dictionary_area: Город/строка таблицы по городам
+        dictionary_year: Год/строка таблицы по годам
+    """
+    template = get_template("3.4.3_template.html")
+    return template.render({'title_1': title_1, 'dictionary_area': dictionary_area, 'dictionary_year': dictionary_year, 'title_2': title_2})
+
+
+if __name__ == '__main__':
+    filename = input()
+    vacancy_name = input()
+    area_name = input()
 
-    title_1 = ['Год',
-              'Динамика уровня зарплат по годам для выбранной профессии и региона',
-              'Динамика количества вакансий по годам для выбранной профессии и региона']
-
-    title_2 = ['Город', 'Зарплата по городу', 'Доля вакансий по городам']
-
-    # Формируем статистику по полученным данным
-    result = pd.read_csv(filename, encoding='utf-8-sig')\
-            .dropna()\
-            .assign(area_name=lambda x: x['area_name'].astype('category'))\
-            .assign(year=lambda x: x.apply(lambda y: y['published_at'].split('T')[0].split('-')[0], axis=1))
-    len_result = len(result)
-    p = len_result // 100
-    salary_by_area = result.groupby('area_name')['salary'].agg(['count', 'mean']).query(f'count > {p}')['mean']\
-                            .sort_values(ascending=False).round(2).head(10).to_dict()
-    distribution_by_area = result.groupby('area_name').count()['salary']
-    distribution_by_area = distribution_by_area[distribution_by_area > p] / len_result
-    distribution_by_area = distribution_by_area.round(3).head(10).to_dict()
-    selected_salary_stat = result[result.name.apply(lambda x: vacancy_name.lower() in x.lower())][result.area_name.apply(lambda x: area_name.lower() == x.lower())][['year', 'salary']].groupby('year').mean().round().to_dict()['salary']
-    selected_count_stat = result[result.name.apply(lambda x: vacancy_name.lower() in x.lower())][result.area_name.apply(lambda x: area_name.lower() == x.lower())].groupby('year').count().to_dict()['salary']
-
-    # Готовим статистику к выгрузке в виде пдф
-    dictionary_area = dict()
-    for area in salary_by_area:
-        dictionary_area[area] = dict()
-        dictionary_area[area][title_2[0]] = area
-        dictionary_area[area][title_2[1]] = salary_by_area[area]
-        dictionary_area[area][title_2[2]] = distribution_by_area[area]
-
-    # Готовим статистику к выгрузке в виде пдф
-    dictionary_year = dict()
-    for year in selected_salary_stat:
-        dictionary_year[year] = dict()
-        dictionary_year[year][title_1[0]] = year
-        dictionary_year[year][title_1[1]] = selected_salary_stat[year]
-        dictionary_year[year][title_1[2]] = selected_count_stat[year]
-
-    # Выгружаем статистику в виде пдф
-    env = Environment(loader=FileSystemLoader('.'))
-    template = env.get_template("3.4.3_template.html")
-    pdf_template = template.render({'title_1': title_1, 'dictionary_area': dictionary_area, 'dictionary_year': dictionary_year, 'title_2': title_2})
-    config = pdfkit.configuration(wkhtmltopdf=r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe')
-    pdfkit.from_string(pdf_template, '3.4.3.pdf', configuration=config)
-
-filename = input()
-vacancy_name = input()
-area_name = input()
-
-get_stats(filename, vacancy_name, area_name)
\ No newline at end of file
+    get_stats(filename, vacancy_name, area_name)
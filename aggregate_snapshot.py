@@ -0,0 +1,89 @@
+import hashlib
+import os
+import pickle
+import re
+
+from csv_shards import read_header
+
+
+BLOCK_SIZE = 1 << 20
+UNSAFE_CHARS = r'[\x00-\x1f\\/:*?"<>|%]'
+SNAPSHOT_VERSION = 2
+
+
+def get_snapshot_name(file_name: str, key: str) -> str:
+    """Название файла снимка для csv-файла и ключа (например, профессии). Символы, недопустимые в названии файла,
+    и сам % заменяются на %XX, поэтому разные ключи дают разные названия.
+
+    Args:
+        file_name (str): Название csv-файла с данными.
+        key (str): Ключ, по которому различаются снимки одного файла.
+
+    Returns:
+        str: Название файла снимка.
+    """
+    key = re.sub(UNSAFE_CHARS, lambda match: f"%{ord(match.group()):02X}", key)
+    return f"{file_name}.{key}.snapshot"
+
+
+def get_fingerprint(file_name: str, offset: int) -> str:
+    """Хеш всей учтённой части файла до offset: по нему видно, что она не менялась, в том числе при правке
+    в середине файла. Хеширование читает часть файла целиком, но это намного быстрее, чем разбирать её заново.
+
+    Args:
+        file_name (str): Название csv-файла с данными.
+        offset (int): Граница учтённой части файла.
+
+    Returns:
+        str: Хеш в шестнадцатеричном виде.
+    """
+    digest = hashlib.sha1()
+    with open(file_name, "rb") as file:
+        while offset > 0:
+            block = file.read(min(BLOCK_SIZE, offset))
+            if not block:
+                break
+            digest.update(block)
+            offset -= len(block)
+    return digest.hexdigest()
+
+
+def load_snapshot(file_name: str, key: str):
+    """Загрузить сохранённые суммы и водяной знак - смещение, до которого файл уже учтён.
+    Если снимка нет, он записан другой версией или учтённая часть файла изменилась,
+    возвращается пустое состояние и начало данных.
+
+    Args:
+        file_name (str): Название csv-файла с данными.
+        key (str): Ключ снимка.
+
+    Returns:
+        (object, int): Сохранённое состояние или None, смещение, с которого нужно дочитать файл.
+    """
+    snapshot_name = get_snapshot_name(file_name, key)
+    if os.path.exists(snapshot_name):
+        with open(snapshot_name, "rb") as file:
+            snapshot = pickle.load(file)
+        offset = snapshot["offset"]
+        if (snapshot.get("version") == SNAPSHOT_VERSION and offset <= os.path.getsize(file_name)
+                and snapshot["fingerprint"] == get_fingerprint(file_name, offset)):
+            return snapshot["state"], offset
+    return None, read_header(file_name)[1]
+
+
+def save_snapshot(file_name: str, key: str, state, offset: int):
+    """Сохранить суммы и водяной знак. Файл снимка заменяется атомарно.
+
+    Args:
+        file_name (str): Название csv-файла с данными.
+        key (str): Ключ снимка.
+        state (object): Состояние для сохранения - суммы и количества из встроенных типов (dict, tuple, числа),
+            чтобы снимок читался без классов скрипта, который его записал.
+        offset (int): Смещение в байтах, до которого файл учтён.
+    """
+    snapshot_name = get_snapshot_name(file_name, key)
+    snapshot = {"version": SNAPSHOT_VERSION, "offset": offset,
+                "fingerprint": get_fingerprint(file_name, offset), "state": state}
+    with open(snapshot_name + ".tmp", "wb") as file:
+        pickle.dump(snapshot, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(snapshot_name + ".tmp", snapshot_name)
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import pickle
+
+import pandas as pd
+
+from date_parsing import decode_published_at
+
+try:
+    from pyarrow import feather
+except ImportError:
+    feather = None
+
+
+HASH_BLOCK_SIZE = 1 << 20
+CACHE_VERSION = 2
+SALARY_COLUMNS = ("salary", "salary_from", "salary_to")
+
+
+def get_cache_names(file_name: str) -> (str, str):
+    """Названия файла с типизированной копией и файла с описанием исходного csv.
+
+    Args:
+        file_name (str): Название csv-файла.
+
+    Returns:
+        (str, str): Файл копии (feather, если установлен pyarrow, иначе pickle) и json-файл с ключом.
+    """
+    extension = "feather" if feather is not None else "pkl"
+    return f"{file_name}.cache.{extension}", f"{file_name}.cache.json"
+
+
+def get_content_hash(file_name: str) -> str:
+    """Хеш содержимого файла.
+
+    Args:
+        file_name (str): Название файла.
+
+    Returns:
+        str: Хеш в шестнадцатеричном виде.
+    """
+    digest = hashlib.sha1()
+    with open(file_name, "rb") as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def get_key(file_name: str) -> dict:
+    """Ключ csv-файла без хеша содержимого: полный путь, размер и время изменения.
+
+    Args:
+        file_name (str): Название csv-файла.
+
+    Returns:
+        dict: Ключ.
+    """
+    stat = os.stat(file_name)
+    return {"path": os.path.abspath(file_name), "size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+
+def convert_columns(data: pd.DataFrame) -> pd.DataFrame:
+    """Привести столбцы к типам копии: area_name - категория, зарплаты - float, год публикации - Int16
+    (без даты публикации - пропуск, чтобы такие строки убирал dropna).
+
+    Args:
+        data (pd.DataFrame): Таблица, прочитанная из csv.
+
+    Returns:
+        pd.DataFrame: Та же таблица с приведёнными столбцами и столбцом year, если есть published_at.
+    """
+    if "area_name" in data:
+        data["area_name"] = data["area_name"].astype("category")
+    for column in SALARY_COLUMNS:
+        if column in data:
+            data[column] = data[column].astype(float)
+    if "published_at" in data:
+        year = decode_published_at(data["published_at"])[0]
+        data["year"] = pd.array(year, dtype="Int16")
+        data.loc[data["published_at"].isna(), "year"] = pd.NA
+    return data
+
+
+def read_vacancies(file_name: str) -> pd.DataFrame:
+    """Прочитать csv-файл с вакансиями через кеш. Если копия есть и файл не менялся, читается копия,
+    иначе csv читается целиком и копия перезаписывается. Файл считается неизменным, если совпали путь,
+    размер и время изменения или, если время изменилось, совпал хеш содержимого. Копия в старом формате
+    (другая CACHE_VERSION) перезаписывается.
+
+    Args:
+        file_name (str): Название csv-файла.
+
+    Returns:
+        pd.DataFrame: Типизированная таблица.
+    """
+    cache_name, key_name = get_cache_names(file_name)
+    key = get_key(file_name)
+    if os.path.exists(cache_name) and os.path.exists(key_name):
+        with open(key_name, encoding="utf-8") as file:
+            saved = json.load(file)
+        is_current = saved.get("version") == CACHE_VERSION
+        is_valid = is_current and saved["key"] == key
+        if is_current and not is_valid and saved["key"]["size"] == key["size"] \
+                and saved["hash"] == get_content_hash(file_name):
+            is_valid = True
+            save_key(key_name, key, saved["hash"])
+        if is_valid:
+            if feather is not None:
+                return feather.read_feather(cache_name, memory_map=True)
+            with open(cache_name, "rb") as file:
+                return pickle.load(file)
+    data = convert_columns(pd.read_csv(file_name, encoding="utf-8-sig"))
+    if feather is not None:
+        feather.write_feather(data, cache_name + ".tmp")
+    else:
+        with open(cache_name + ".tmp", "wb") as file:
+            pickle.dump(data, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(cache_name + ".tmp", cache_name)
+    save_key(key_name, key, get_content_hash(file_name))
+    return data
+
+
+def save_key(key_name: str, key: dict, content_hash: str):
+    """Сохранить ключ и хеш содержимого csv-файла, для которого записана копия, и версию формата копии.
+
+    Args:
+        key_name (str): Название json-файла с ключом.
+        key (dict): Ключ csv-файла.
+        content_hash (str): Хеш содержимого.
+    """
+    with open(key_name + ".tmp", "w", encoding="utf-8") as file:
+        json.dump({"key": key, "hash": content_hash, "version": CACHE_VERSION}, file)
+    os.replace(key_name + ".tmp", key_name)
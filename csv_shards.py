@@ -0,0 +1,114 @@
+import csv
+import os
+
+
+WINDOW_SIZE = 1 << 20
+
+
+def read_header(file_name: str, encoding: str = "utf-8-sig") -> (list, int):
+    """Прочитать заголовок csv-файла.
+
+    Args:
+        file_name (str): Название csv-файла.
+        encoding (str): Кодировка файла.
+
+    Returns:
+        (list, int): Названия столбцов и смещение в байтах, с которого начинаются данные.
+    """
+    with open(file_name, "rb") as file:
+        line = file.readline()
+    return next(csv.reader([line.decode(encoding)])), len(line)
+
+
+def find_record_starts(file, data_start: int, offsets: list) -> list:
+    """Найти для каждого смещения первое начало записи не раньше него. Файл читается один раз от начала данных
+    с подсчётом кавычек: перевод строки заканчивает запись, только если перед ним чётное число кавычек, то есть
+    он не стоит внутри поля в кавычках. Так считает csv.reader для файлов, где кавычки стоят только вокруг
+    полей целиком (кавычка внутри поля удваивается), как их пишет csv.writer.
+
+    Args:
+        file (BinaryIO): Файл, открытый в бинарном режиме.
+        data_start (int): Смещение начала данных - заведомо начало записи.
+        offsets (list): Смещения в байтах по возрастанию, не меньше data_start.
+
+    Returns:
+        list: Смещения начал записей для каждого из offsets или размер файла, если записей дальше нет.
+    """
+    size = os.fstat(file.fileno()).st_size
+    starts = []
+    targets = iter(offsets)
+    target = next(targets, None)
+    position, quotes = data_start, 0
+    file.seek(data_start)
+    while target is not None:
+        chunk = file.read(WINDOW_SIZE)
+        if not chunk:
+            break
+        end = position + len(chunk)
+        while target is not None and target - 1 < end:
+            index = max(target - 1 - position, 0)
+            parity = (quotes + chunk.count(b'"', 0, index)) % 2
+            newline = chunk.find(b"\n", index)
+            while newline != -1:
+                parity = (parity + chunk.count(b'"', index, newline)) % 2
+                if parity == 0:
+                    break
+                index = newline
+                newline = chunk.find(b"\n", newline + 1)
+            if newline == -1:
+                break
+            starts.append(position + newline + 1)
+            target = next(targets, None)
+        quotes += chunk.count(b'"')
+        position = end
+    return starts + [size] * (len(offsets) - len(starts))
+
+
+def split_csv(file_name: str, parts: int) -> list:
+    """Разделить csv-файл на диапазоны байтов, каждый из которых начинается с начала записи
+    (см. find_record_starts). Сортировка данных по времени не требуется: диапазоны можно обрабатывать в любом порядке.
+
+    Args:
+        file_name (str): Название csv-файла.
+        parts (int): Желаемое количество диапазонов.
+
+    Returns:
+        list: Список пар (начало, конец) в байтах. Заголовок в диапазоны не входит.
+    """
+    header, data_start = read_header(file_name)
+    size = os.path.getsize(file_name)
+    offsets = [data_start + (size - data_start) * i // parts for i in range(1, parts)]
+    with open(file_name, "rb") as file:
+        bounds = [data_start] + find_record_starts(file, data_start, offsets) + [size]
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+
+
+def read_shard(file_name: str, start: int, end: int, encoding: str = "utf-8"):
+    """Построчно читать записи, которые начинаются внутри диапазона [start, end).
+    Запись, начавшаяся до end, дочитывается целиком, даже если заканчивается за ним.
+
+    Args:
+        file_name (str): Название csv-файла.
+        start (int): Начало диапазона, должно совпадать с началом записи.
+        end (int): Конец диапазона.
+        encoding (str): Кодировка файла.
+
+    Yields:
+        list: Поля очередной записи.
+    """
+    position = start
+
+    def lines(file):
+        nonlocal position
+        for line in file:
+            position += len(line)
+            yield line.decode(encoding)
+
+    with open(file_name, "rb") as file:
+        file.seek(start)
+        reader = csv.reader(lines(file))
+        while position < end:
+            row = next(reader, None)
+            if row is None:
+                break
+            yield row
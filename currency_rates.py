@@ -0,0 +1,113 @@
+import csv
+import datetime
+
+import numpy as np
+
+from date_parsing import parse_published_at
+
+
+class RateTable:
+    """Курсы валют к рублю по дням: плотный массив [номер дня от start, индекс валюты].
+    Дни без публикации заполняются последним опубликованным курсом, пустой курс остаётся NaN.
+
+    Attributes:
+        start (datetime.date): Первый день таблицы.
+        currencies (list): Валюты в порядке столбцов.
+        rates (np.ndarray): Курсы float64, NaN - курса нет.
+    """
+    def __init__(self, dates: list, currencies: list, values: np.ndarray, monthly: bool):
+        """Инициализация объекта RateTable. Раскладка опубликованных курсов по дням.
+
+        Args:
+            dates (list): Даты публикации (datetime.date) по возрастанию.
+            currencies (list): Валюты.
+            values (np.ndarray): Курсы на даты публикации, строка на каждую дату.
+            monthly (bool): Курсы помесячные: курс действует только до конца своего месяца.
+        """
+        self.start = dates[0]
+        self.currencies = list(currencies)
+        self.currency_index = {currency: i for i, currency in enumerate(self.currencies)}
+        offsets = np.array([(date - self.start).days for date in dates])
+        if monthly:
+            ends = np.array([(self.get_next_month(date) - self.start).days for date in dates])
+        else:
+            ends = np.full(len(dates), offsets.max() + 1)
+        row_for_day = np.full(ends.max(), -1)
+        row_for_day[offsets] = np.arange(len(dates))
+        row_for_day = np.maximum.accumulate(row_for_day)
+        is_covered = np.arange(len(row_for_day)) < ends[row_for_day]
+        self.rates = np.where(is_covered[:, None], values[row_for_day], np.nan)
+
+    @staticmethod
+    def get_next_month(date: datetime.date) -> datetime.date:
+        """Первое число следующего месяца.
+
+        Args:
+            date (datetime.date): Дата.
+
+        Returns:
+            datetime.date: Первое число месяца после date.
+        """
+        return datetime.date(date.year + date.month // 12, date.month % 12 + 1, 1)
+
+    @classmethod
+    def from_csv(cls, file_name: str = 'complite.csv'):
+        """Загрузить таблицу из csv-файла 3.3.1: столбец date (YYYY-MM или YYYY-MM-DD) и столбцы валют.
+
+        Args:
+            file_name (str): Название csv-файла с курсами.
+
+        Returns:
+            RateTable: Таблица курсов.
+        """
+        dates, values = [], []
+        monthly = True
+        with open(file_name, encoding='utf-8') as file:
+            reader = csv.reader(file)
+            currencies = next(reader)[1:]
+            for line in reader:
+                parts = parse_published_at(line[0])
+                monthly = monthly and len(parts) == 2
+                dates.append(datetime.date(*(parts + (1,))[:3]))
+                values.append([float(value) if value != '' else np.nan for value in line[1:]])
+        order = np.argsort(np.array(dates, dtype='datetime64[D]'), kind='stable')
+        return cls([dates[i] for i in order], currencies, np.array(values, dtype=float)[order], monthly)
+
+    def __len__(self):
+        return len(self.rates)
+
+    def get_rate(self, year: int, month: int, day: int, currency: str) -> float:
+        """Курс валюты на день.
+
+        Args:
+            year (int): Год.
+            month (int): Месяц.
+            day (int): День.
+            currency (str): Код валюты.
+
+        Returns:
+            float: Курс за единицу валюты или NaN, если курса нет.
+        """
+        offset = (datetime.date(year, month, day) - self.start).days
+        index = self.currency_index.get(currency)
+        if index is None or not 0 <= offset < len(self.rates):
+            return np.nan
+        return self.rates[offset, index]
+
+    def get_rates(self, days: np.ndarray, currencies) -> np.ndarray:
+        """Курсы для массива дней и валют одной выборкой из массива.
+
+        Args:
+            days (np.ndarray): Даты datetime64[D].
+            currencies (Iterable): Коды валют той же длины.
+
+        Returns:
+            np.ndarray: Курсы, NaN - курса нет.
+        """
+        offsets = (days - np.datetime64(self.start, 'D')).astype(np.int64)
+        codes, inverse = np.unique(np.asarray(currencies, dtype=str), return_inverse=True)
+        indexes = np.array([self.currency_index.get(code, -1) for code in codes], dtype=np.int64)[inverse]
+        is_valid = (indexes >= 0) & (offsets >= 0) & (offsets < len(self.rates))
+        result = np.full(len(offsets), np.nan)
+        result[is_valid] = self.rates[offsets[is_valid], indexes[is_valid]]
+        return result
@@ -0,0 +1,116 @@
+import re
+
+import numpy as np
+
+
+DIGITS = re.compile(r"\d+")
+DATE_LENGTH = len("YYYY-MM-DD")
+
+
+def is_fixed_layout(published_at: str) -> bool:
+    """Проверить, что дата записана в виде YYYY-MM-DDTHH:MM:SS+ZZZZ.
+
+    Args:
+        published_at (str): Дата публикации.
+
+    Returns:
+        bool: True, если части даты стоят на фиксированных позициях.
+    """
+    return len(published_at) == 24 and published_at[4] == "-" and published_at[7] == "-" \
+        and published_at[10] == "T" and published_at[13] == ":" and published_at[16] == ":" \
+        and published_at[19] in "+-"
+
+
+def parse_published_at(published_at: str) -> tuple:
+    """Разобрать дату публикации в кортеж чисел (год, месяц, день, часы, минуты, секунды) без часового пояса.
+    Для фиксированного формата части берутся срезами, иначе - все группы цифр по порядку.
+
+    Args:
+        published_at (str): Дата публикации, например 2022-07-19T11:10:32+0300 или 2022-07.
+
+    Returns:
+        tuple: Числа даты, столько, сколько есть в строке, но не больше шести.
+    """
+    if is_fixed_layout(published_at):
+        return (int(published_at[0:4]), int(published_at[5:7]), int(published_at[8:10]),
+                int(published_at[11:13]), int(published_at[14:16]), int(published_at[17:19]))
+    return tuple(int(part) for part in DIGITS.findall(published_at)[:6])
+
+
+def get_year(published_at: str) -> int:
+    """Год публикации. Для строк вида YYYY-... год берётся срезом, иначе - через parse_published_at.
+
+    Args:
+        published_at (str): Дата публикации.
+
+    Returns:
+        int: Год.
+
+    Raises:
+        ValueError: В строке нет цифр.
+    """
+    if published_at[4:5] == "-" and published_at[:4].isdigit():
+        return int(published_at[:4])
+    parts = parse_published_at(published_at)
+    if not parts:
+        raise ValueError(f"Не удалось определить год публикации: {published_at!r}")
+    return parts[0]
+
+
+def get_year_month(published_at: str) -> (int, int):
+    """Год и месяц публикации.
+
+    Args:
+        published_at (str): Дата публикации.
+
+    Returns:
+        (int, int): Год и месяц.
+    """
+    if published_at[4:5] == "-" and published_at[7:8] in ("-", ""):
+        return int(published_at[:4]), int(published_at[5:7])
+    return parse_published_at(published_at)[:2]
+
+
+def decode_published_at(values) -> (np.ndarray, np.ndarray, np.ndarray):
+    """Разобрать столбец дат публикации в массивы года, месяца и дня за один раз.
+    Первые 10 символов всех строк переводятся в байты и разбираются арифметикой над цифрами,
+    строки другого формата разбираются по одной через parse_published_at. Пропуски и строки без цифр
+    получают год 0, месяц и день 1.
+
+    Args:
+        values (Iterable[str]): Даты публикации (список, массив или pandas.Series).
+
+    Returns:
+        (np.ndarray, np.ndarray, np.ndarray): Годы (int16), месяцы (int8), дни (int8).
+    """
+    strings = np.asarray(values, dtype=object)
+    try:
+        raw = strings.astype(f"S{DATE_LENGTH}")
+    except (UnicodeEncodeError, TypeError, ValueError):
+        raw = np.zeros(len(strings), dtype=f"S{DATE_LENGTH}")
+    codes = raw.view(np.uint8).reshape(-1, DATE_LENGTH).astype(np.int16) - ord("0")
+    digits = np.delete(codes, [4, 7], axis=1)
+    is_fast = (codes[:, 4] == ord("-") - ord("0")) & (codes[:, 7] == ord("-") - ord("0")) \
+        & ((digits >= 0) & (digits <= 9)).all(axis=1)
+    year = (codes[:, 0] * 1000 + codes[:, 1] * 100 + codes[:, 2] * 10 + codes[:, 3]).astype(np.int16)
+    month = (codes[:, 5] * 10 + codes[:, 6]).astype(np.int8)
+    day = (codes[:, 8] * 10 + codes[:, 9]).astype(np.int8)
+    for i in np.flatnonzero(~is_fast):
+        parts = (parse_published_at(str(strings[i])) or (0,)) + (1, 1)
+        year[i], month[i], day[i] = parts[:3]
+    return year, month, day
+
+
+def to_days(year: np.ndarray, month: np.ndarray, day: np.ndarray) -> np.ndarray:
+    """Собрать массив дат datetime64[D] из массивов года, месяца и дня.
+
+    Args:
+        year (np.ndarray): Годы.
+        month (np.ndarray): Месяцы.
+        day (np.ndarray): Дни.
+
+    Returns:
+        np.ndarray: Даты с точностью до дня.
+    """
+    months = (year.astype(np.int64) - 1970) * 12 + month.astype(np.int64) - 1
+    return months.astype("datetime64[M]").astype("datetime64[D]") + (day.astype(np.int64) - 1)
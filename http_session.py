@@ -0,0 +1,19 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def create_session(workers: int) -> requests.Session:
+    """Сессия с пулом соединений на workers потоков и повтором запросов с нарастающей паузой.
+
+    Args:
+        workers (int): Количество потоков, которые одновременно используют сессию.
+
+    Returns:
+        requests.Session: Сессия requests.
+    """
+    retry = Retry(total=5, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+    session = requests.Session()
+    session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=workers, max_retries=retry))
+    session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=workers, max_retries=retry))
+    return session
@@ -0,0 +1,203 @@
+import csv
+import json
+import os
+
+import numpy as np
+
+from csv_cache import get_key
+
+
+GRAM_SIZE = 3
+
+
+def get_index_name(file_name: str) -> str:
+    """Название файла индекса для csv-файла.
+
+    Args:
+        file_name (str): Название csv-файла с вакансиями.
+
+    Returns:
+        str: Название файла индекса.
+    """
+    return f"{file_name}.names.npz"
+
+
+def get_grams(text: str) -> set:
+    """Триграммы строки.
+
+    Args:
+        text (str): Строка.
+
+    Returns:
+        set: Все подстроки длины GRAM_SIZE.
+    """
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+class NameIndex:
+    """Инвертированный индекс названий вакансий: триграмма названия в нижнем регистре -> номера уникальных
+    названий, номер строки файла -> номер названия. Поиск подстроки сначала пересекает списки триграмм,
+    затем проверяет только названия-кандидаты. Строки считаются по непустым записям csv после заголовка.
+
+    Attributes:
+        names (list): Уникальные названия вакансий.
+        name_codes (np.ndarray): Номер названия для каждой строки файла.
+    """
+    def __init__(self, names: list, name_codes: np.ndarray, grams: np.ndarray = None,
+                 offsets: np.ndarray = None, postings: np.ndarray = None):
+        """Инициализация объекта NameIndex. Если списки триграмм не переданы, они строятся по names.
+
+        Args:
+            names (list): Уникальные названия вакансий.
+            name_codes (np.ndarray): Номер названия для каждой строки файла.
+            grams (np.ndarray): Отсортированные триграммы.
+            offsets (np.ndarray): Начало списка каждой триграммы в postings и конец последнего.
+            postings (np.ndarray): Номера названий всех триграмм подряд.
+        """
+        self.names = list(names)
+        self.name_codes = np.asarray(name_codes, dtype=np.int32)
+        if grams is None:
+            gram_to_names = {}
+            for i, name in enumerate(self.names):
+                for gram in get_grams(name.lower()):
+                    gram_to_names.setdefault(gram, []).append(i)
+            grams = sorted(gram_to_names)
+            lengths = [len(gram_to_names[gram]) for gram in grams]
+            offsets = np.concatenate(([0], np.cumsum(lengths, dtype=np.int64)))
+            postings = np.fromiter((i for gram in grams for i in gram_to_names[gram]), dtype=np.int32,
+                                   count=int(offsets[-1]))
+        self.grams = np.asarray(grams, dtype=str)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.postings = np.asarray(postings, dtype=np.int32)
+        self.__gram_index = {gram: i for i, gram in enumerate(self.grams.tolist())}
+
+    @classmethod
+    def build(cls, file_name: str):
+        """Построить индекс по столбцу name csv-файла.
+
+        Args:
+            file_name (str): Название csv-файла с вакансиями.
+
+        Returns:
+            NameIndex: Индекс.
+        """
+        name_to_code = {}
+        codes = []
+        with open(file_name, encoding="utf-8-sig", newline="") as file:
+            reader = csv.reader(file)
+            column = next(reader).index("name")
+            for row in reader:
+                if row:
+                    name = row[column] if len(row) > column else ""
+                    codes.append(name_to_code.setdefault(name, len(name_to_code)))
+        return cls(list(name_to_code), np.array(codes, dtype=np.int32))
+
+    def save(self, file_name: str):
+        """Сохранить индекс рядом с csv-файлом вместе с ключом csv-файла.
+
+        Args:
+            file_name (str): Название csv-файла, по которому построен индекс.
+        """
+        index_name = get_index_name(file_name)
+        with open(index_name + ".tmp", "wb") as file:
+            np.savez(file, names=np.array(self.names, dtype=str), name_codes=self.name_codes, grams=self.grams,
+                     offsets=self.offsets, postings=self.postings, key=np.array(json.dumps(get_key(file_name))))
+        os.replace(index_name + ".tmp", index_name)
+
+    @classmethod
+    def load(cls, file_name: str):
+        """Загрузить индекс csv-файла.
+
+        Args:
+            file_name (str): Название csv-файла с вакансиями.
+
+        Returns:
+            NameIndex: Индекс или None, если индекса нет или csv-файл изменился после его построения.
+        """
+        index_name = get_index_name(file_name)
+        if not os.path.exists(index_name):
+            return None
+        with np.load(index_name) as index:
+            if json.loads(str(index["key"])) != get_key(file_name):
+                return None
+            return cls(index["names"].tolist(), index["name_codes"], index["grams"], index["offsets"],
+                       index["postings"])
+
+    def __len__(self):
+        return len(self.name_codes)
+
+    def find_names(self, substring: str, ignore_case: bool = False) -> np.ndarray:
+        """Номера названий, в которые входит подстрока.
+
+        Args:
+            substring (str): Искомая подстрока (например, профессия).
+            ignore_case (bool): Искать без учёта регистра.
+
+        Returns:
+            np.ndarray: Отсортированные номера названий в names.
+        """
+        lower = substring.lower()
+        indexes = [self.__gram_index.get(gram) for gram in get_grams(lower)]
+        if None in indexes:
+            return np.zeros(0, dtype=np.int32)
+        candidates = None
+        for i in sorted(indexes, key=lambda x: self.offsets[x + 1] - self.offsets[x]):
+            posting = self.postings[self.offsets[i]:self.offsets[i + 1]]
+            candidates = posting if candidates is None else np.intersect1d(candidates, posting, assume_unique=True)
+        if candidates is None:
+            candidates = range(len(self.names))
+        if ignore_case:
+            found = [i for i in candidates if lower in self.names[i].lower()]
+        else:
+            found = [i for i in candidates if substring in self.names[i]]
+        return np.array(found, dtype=np.int32)
+
+    def get_row_mask(self, substring: str, ignore_case: bool = False) -> np.ndarray:
+        """Маска строк файла, в названии которых есть подстрока.
+
+        Args:
+            substring (str): Искомая подстрока (например, профессия).
+            ignore_case (bool): Искать без учёта регистра.
+
+        Returns:
+            np.ndarray: Булев массив длиной в число строк файла.
+        """
+        is_found = np.zeros(len(self.names), dtype=bool)
+        is_found[self.find_names(substring, ignore_case)] = True
+        return is_found[self.name_codes]
+
+    def find_rows(self, substring: str, ignore_case: bool = False) -> np.ndarray:
+        """Номера строк файла, в названии которых есть подстрока.
+
+        Args:
+            substring (str): Искомая подстрока (например, профессия).
+            ignore_case (bool): Искать без учёта регистра.
+
+        Returns:
+            np.ndarray: Отсортированные номера строк.
+        """
+        return np.flatnonzero(self.get_row_mask(substring, ignore_case))
+
+
+def get_name_mask(file_name: str, names, substring: str) -> np.ndarray:
+    """Маска строк таблицы, в названии которых есть подстрока без учёта регистра. Если для файла построен
+    индекс, поиск идёт по нему, иначе - по всем строкам через str.contains.
+
+    Args:
+        file_name (str): Название csv-файла, из которого прочитана таблица.
+        names (pandas.Series): Столбец name всей таблицы, строка за строкой файла.
+        substring (str): Искомая подстрока (например, профессия).
+
+    Returns:
+        np.ndarray: Булев массив длиной в число строк таблицы.
+    """
+    index = NameIndex.load(file_name)
+    if index is not None and len(index) == len(names):
+        return index.get_row_mask(substring, ignore_case=True)
+    return names.str.lower().str.contains(substring.lower(), regex=False, na=False).to_numpy(dtype=bool)
+
+
+if __name__ == '__main__':
+    file_name = input()
+
+    NameIndex.build(file_name).save(file_name)
@@ -0,0 +1,143 @@
+import os
+import shutil
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+
+import pdfkit
+
+try:
+    from xhtml2pdf import pisa
+except ImportError:
+    pisa = None
+
+
+WKHTMLTOPDF_ENV = "WKHTMLTOPDF"
+PDF_BACKEND_ENV = "PDF_BACKEND"
+WINDOWS_WKHTMLTOPDF = r"C:/Program Files/wkhtmltopdf/bin/wkhtmltopdf.exe"
+
+
+def find_wkhtmltopdf() -> str:
+    """Путь к wkhtmltopdf: из переменной окружения WKHTMLTOPDF, из PATH или стандартный путь установки в Windows.
+
+    Returns:
+        str: Путь к исполняемому файлу или None, если wkhtmltopdf не найден.
+    """
+    binary = os.environ.get(WKHTMLTOPDF_ENV) or shutil.which("wkhtmltopdf")
+    if binary is None and os.path.exists(WINDOWS_WKHTMLTOPDF):
+        binary = WINDOWS_WKHTMLTOPDF
+    return binary
+
+
+class PdfBackend(ABC):
+    """Преобразование HTML-страниц отчётов в pdf. Пакет страниц обрабатывается в пуле executor,
+    который живёт, пока не обработаны все страницы пакета. Наследник должен определить write.
+
+    Attributes:
+        workers (int): Размер пула для пакета, по умолчанию - количество ядер.
+    """
+    executor = ThreadPoolExecutor
+
+    def __init__(self, workers: int = None):
+        """Инициализация объекта PdfBackend.
+
+        Args:
+            workers (int): Размер пула для пакета.
+        """
+        self.workers = workers or os.cpu_count()
+
+    @abstractmethod
+    def write(self, html: str, pdf_name: str):
+        """Записать pdf-файл по HTML-странице.
+
+        Args:
+            html (str): HTML-страница.
+            pdf_name (str): Название pdf-файла.
+        """
+
+    def write_many(self, pages):
+        """Записать пакет pdf-файлов. Страницы отправляются в пул по мере получения из pages,
+        поэтому генератор страниц может готовить следующую страницу, пока пишутся предыдущие.
+
+        Args:
+            pages (Iterable[tuple]): Пары (HTML-страница, название pdf-файла).
+
+        Returns:
+            list: Названия записанных pdf-файлов в порядке pages.
+        """
+        with self.executor(max_workers=self.workers) as executor:
+            futures = [(executor.submit(self.write, html, pdf_name), pdf_name) for html, pdf_name in pages]
+            for future, _ in futures:
+                future.result()
+        return [pdf_name for _, pdf_name in futures]
+
+
+class WkhtmltopdfBackend(PdfBackend):
+    """pdf через wkhtmltopdf (pdfkit). Каждая страница - отдельный процесс wkhtmltopdf,
+    в пакете процессы запускаются одновременно из пула потоков.
+
+    Attributes:
+        binary (str): Путь к wkhtmltopdf.
+        options (dict): Параметры wkhtmltopdf.
+        configuration (pdfkit.configuration.Configuration): Конфигурация pdfkit, создаётся один раз.
+    """
+    def __init__(self, binary: str = None, options: dict = None, workers: int = None):
+        """Инициализация объекта WkhtmltopdfBackend.
+
+        Args:
+            binary (str): Путь к wkhtmltopdf, по умолчанию - см. find_wkhtmltopdf.
+            options (dict): Параметры wkhtmltopdf.
+            workers (int): Количество одновременных процессов wkhtmltopdf в пакете.
+        """
+        super().__init__(workers)
+        self.binary = binary or find_wkhtmltopdf()
+        if self.binary is None:
+            raise FileNotFoundError(f"wkhtmltopdf не найден, укажите путь в переменной окружения {WKHTMLTOPDF_ENV}")
+        self.options = options
+        self.configuration = pdfkit.configuration(wkhtmltopdf=self.binary)
+
+    def write(self, html: str, pdf_name: str):
+        pdfkit.from_string(html, pdf_name, configuration=self.configuration, options=self.options)
+
+
+class Xhtml2pdfBackend(PdfBackend):
+    """pdf через xhtml2pdf без внешних программ. Рендеринг идёт на Python, поэтому пакет обрабатывается
+    в пуле процессов. Поддерживает только часть CSS, поэтому вёрстка может отличаться от wkhtmltopdf.
+    """
+    executor = ProcessPoolExecutor
+
+    def __init__(self, workers: int = None):
+        """Инициализация объекта Xhtml2pdfBackend.
+
+        Args:
+            workers (int): Количество процессов в пакете.
+        """
+        if pisa is None:
+            raise ImportError("xhtml2pdf не установлен")
+        super().__init__(workers)
+
+    def write(self, html: str, pdf_name: str):
+        with open(pdf_name, "wb") as file:
+            status = pisa.CreatePDF(html, dest=file, encoding="utf-8")
+        if status.err:
+            raise RuntimeError(f"xhtml2pdf не смог записать {pdf_name}")
+
+
+BACKENDS = {"wkhtmltopdf": WkhtmltopdfBackend, "xhtml2pdf": Xhtml2pdfBackend}
+
+
+@lru_cache(maxsize=None)
+def get_backend(name: str = None) -> PdfBackend:
+    """Бэкенд pdf, один на процесс для каждого названия.
+
+    Args:
+        name (str): Название из BACKENDS, по умолчанию - из переменной окружения PDF_BACKEND, иначе wkhtmltopdf,
+            если он найден, и xhtml2pdf, если нет.
+
+    Returns:
+        PdfBackend: Бэкенд.
+    """
+    name = name or os.environ.get(PDF_BACKEND_ENV)
+    if name is None:
+        name = "wkhtmltopdf" if find_wkhtmltopdf() is not None or pisa is None else "xhtml2pdf"
+    return BACKENDS[name]()
@@ -0,0 +1,95 @@
+from collections import deque
+
+
+class ProfessionMatcher:
+    """Поиск всех профессий из списка в названии вакансии за один проход по строке (автомат Ахо-Корасик).
+
+    Attributes:
+        professions (list): Названия профессий.
+        ignore_case (bool): Искать без учёта регистра.
+    """
+    cache_size = 1 << 16
+
+    def __init__(self, professions: list, ignore_case: bool = False):
+        """Инициализация объекта ProfessionMatcher. Построение бора профессий и суффиксных ссылок.
+
+        Args:
+            professions (list): Названия профессий.
+            ignore_case (bool): Искать без учёта регистра.
+        """
+        self.professions = list(professions)
+        self.ignore_case = ignore_case
+        self.__goto = [{}]
+        self.__fail = [0]
+        self.__output = [()]
+        for index, profession in enumerate(self.professions):
+            state = 0
+            for char in self.normalize(profession):
+                if char not in self.__goto[state]:
+                    self.__goto[state][char] = len(self.__goto)
+                    self.__goto.append({})
+                    self.__fail.append(0)
+                    self.__output.append(())
+                state = self.__goto[state][char]
+            self.__output[state] += (index,)
+        queue = deque(self.__goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.__goto[state].items():
+                queue.append(next_state)
+                fail = self.__fail[state]
+                while fail and char not in self.__goto[fail]:
+                    fail = self.__fail[fail]
+                fail = self.__goto[fail].get(char, 0)
+                self.__fail[next_state] = fail if fail != next_state else 0
+                self.__output[next_state] += self.__output[self.__fail[next_state]]
+        self.__cache = {}
+
+    def normalize(self, text: str) -> str:
+        """Привести строку к виду, в котором идёт поиск.
+
+        Args:
+            text (str): Исходная строка.
+
+        Returns:
+            str: Строка в нижнем регистре, если поиск без учёта регистра, иначе та же строка.
+        """
+        return text.lower() if self.ignore_case else text
+
+    def find(self, name: str) -> tuple:
+        """Найти все профессии, которые входят в название вакансии. Результаты для повторяющихся названий кешируются.
+
+        Args:
+            name (str): Название вакансии.
+
+        Returns:
+            tuple: Отсортированные индексы найденных профессий в professions.
+        """
+        found = self.__cache.get(name)
+        if found is not None:
+            return found
+        goto, fail, output = self.__goto, self.__fail, self.__output
+        matches = set(output[0])
+        state = 0
+        for char in self.normalize(name):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                matches.update(output[state])
+        found = tuple(sorted(matches))
+        if len(self.__cache) >= self.cache_size:
+            self.__cache.clear()
+        self.__cache[name] = found
+        return found
+
+    def find_names(self, name: str) -> list:
+        """Найти названия всех профессий, которые входят в название вакансии.
+
+        Args:
+            name (str): Название вакансии.
+
+        Returns:
+            list: Названия найденных профессий.
+        """
+        return [self.professions[index] for index in self.find(name)]
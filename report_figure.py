@@ -0,0 +1,112 @@
+import base64
+import io
+
+from matplotlib import rcParams
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+
+MIME_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+SUBPLOT_PARAMS = ("left", "bottom", "right", "top", "wspace", "hspace")
+
+
+class ReportFigure:
+    """Фигура 2x2 с графиками отчёта. Рисуется на Agg без pyplot: не открывает окон, не попадает в список фигур
+    pyplot и не зависит от бэкенда по умолчанию, поэтому её можно рисовать в рабочем потоке. При пакетном
+    построении одна фигура используется для всех отчётов: ось перерисовывается, только если изменилось то,
+    что на ней нарисовано, а у изменяемых столбцов с теми же подписями меняется только высота. Изображение
+    не зависит от того, что было нарисовано на фигуре раньше.
+
+    Attributes:
+        figure (Figure): Фигура.
+        axis (np.ndarray): Оси 2x2.
+        layouts (dict): Позиция оси/данные, которые на ней нарисованы, кроме высот изменяемых столбцов.
+        bars (dict): Позиция оси/изменяемые столбцы.
+        default_subplot_params (dict): Отступы фигуры до первого расчёта tight_layout.
+        pad_font_size (float): Размер шрифта в пунктах, в долях которого заданы отступы tight_layout.
+    """
+    def __init__(self, figsize: tuple = None, pad_font_size: float = None):
+        """Инициализация объекта ReportFigure.
+
+        Args:
+            figsize (tuple): Ширина и высота фигуры в дюймах, по умолчанию - из rcParams.
+            pad_font_size (float): Размер шрифта для отступов tight_layout, по умолчанию - font.size из rcParams.
+        """
+        self.pad_font_size = pad_font_size
+        self.figure = Figure(figsize=figsize)
+        FigureCanvasAgg(self.figure)
+        self.axis = self.figure.subplots(2, 2)
+        self.layouts = {}
+        self.bars = {}
+        self.default_subplot_params = {name: getattr(self.figure.subplotpars, name) for name in SUBPLOT_PARAMS}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def draw(self, position: tuple, layout, heights, function, *args):
+        """Нарисовать ось. Если на оси уже нарисован тот же layout, меняются только высоты изменяемых столбцов,
+        иначе ось рисуется функцией function(ax, *args). Если на оси уже что-то нарисовано, вместо неё создаётся
+        новая ось на том же месте, чтобы от прошлого рисунка не осталось локаторов, единиц и настроек делений.
+
+        Args:
+            position (tuple): Позиция оси.
+            layout: Всё, что рисует функция, кроме высот изменяемых столбцов (должно поддерживать сравнение).
+            heights (list): Высоты изменяемых столбцов или None, если их нет.
+            function (Callable): Функция рисования оси, возвращает изменяемые столбцы (BarContainer) или None.
+            *args: Аргументы функции после оси.
+        """
+        ax = self.axis[position]
+        if position not in self.layouts or self.layouts[position] != layout:
+            if position in self.layouts:
+                ax.remove()
+                ax = self.axis[position] = self.figure.add_subplot(ax.get_subplotspec())
+            self.bars[position] = function(ax, *args)
+            self.layouts[position] = layout
+        elif heights is not None:
+            for bar, height in zip(self.bars[position], heights):
+                bar.set_height(height)
+            ax.relim()
+            ax.autoscale_view()
+
+    def save(self, file, dpi: int = None, image_format: str = None,
+             pad: float = 1.08, h_pad: float = None, w_pad: float = None):
+        """Сохранить фигуру. Отступы считаются заново от параметров по умолчанию, так как от высот столбцов
+        зависят подписи делений.
+
+        Args:
+            file (str | BinaryIO): Название файла или открытый двоичный файл.
+            dpi (int): Разрешение, по умолчанию - из rcParams.
+            image_format (str): Формат (png, svg), по умолчанию - по расширению файла.
+            pad (float): Отступ от краёв фигуры в долях pad_font_size.
+            h_pad (float): Отступ между строками осей в долях pad_font_size, по умолчанию - pad.
+            w_pad (float): Отступ между столбцами осей в долях pad_font_size, по умолчанию - pad.
+        """
+        scale = 1 if self.pad_font_size is None else self.pad_font_size / rcParams["font.size"]
+        self.figure.subplots_adjust(**self.default_subplot_params)
+        self.figure.tight_layout(pad=pad * scale, h_pad=None if h_pad is None else h_pad * scale,
+                                 w_pad=None if w_pad is None else w_pad * scale)
+        self.figure.savefig(file, dpi=dpi, format=image_format)
+
+    def get_data_uri(self, image_format: str = "png", dpi: int = None, **kwargs) -> str:
+        """Сохранить фигуру в памяти и вернуть её в виде data URI для src тега img.
+
+        Args:
+            image_format (str): Формат из MIME_TYPES.
+            dpi (int): Разрешение, по умолчанию - из rcParams.
+            **kwargs: Отступы tight_layout, см. save.
+
+        Returns:
+            str: data URI с изображением в base64.
+        """
+        buffer = io.BytesIO()
+        self.save(buffer, dpi, image_format, **kwargs)
+        return f"data:{MIME_TYPES[image_format]};base64,{base64.b64encode(buffer.getvalue()).decode('ascii')}"
+
+    def close(self):
+        """Освободить фигуру и все нарисованные на ней объекты."""
+        self.figure.clear()
+        self.layouts.clear()
+        self.bars.clear()
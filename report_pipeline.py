@@ -0,0 +1,78 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+class ReportPipeline:
+    """Граф этапов отчёта (таблица, график, html, pdf). Этапы выполняются в пуле потоков: этап начинается,
+    как только готовы все этапы, от которых он зависит, независимые этапы идут одновременно.
+
+    Attributes:
+        workers (int): Количество потоков, по умолчанию - по одному на этап.
+        stages (dict): Название этапа/(функция, аргументы, входы, зависимости) в порядке добавления.
+        results (dict): Название этапа/результат функции после run.
+        timings (dict): Название этапа/(начало, конец) в секундах от запуска run.
+    """
+    def __init__(self, workers: int = None):
+        """Инициализация объекта ReportPipeline.
+
+        Args:
+            workers (int): Количество потоков.
+        """
+        self.workers = workers
+        self.stages = {}
+        self.results = {}
+        self.timings = {}
+
+    def add(self, name: str, function, *args, inputs: tuple = (), depends: tuple = ()):
+        """Добавить этап. Зависимости должны быть добавлены раньше, поэтому граф не содержит циклов.
+
+        Args:
+            name (str): Название этапа.
+            function (Callable): Функция этапа.
+            *args: Аргументы функции.
+            inputs (tuple): Этапы, результаты которых передаются в функцию после args в этом порядке.
+            depends (tuple): Этапы, которые должны закончиться до начала этого, без передачи результата
+                (например, запись файла, который нужен этому этапу).
+
+        Returns:
+            ReportPipeline: Этот же граф, чтобы добавлять этапы цепочкой.
+        """
+        missing = [stage for stage in inputs + depends if stage not in self.stages]
+        if name in self.stages or missing:
+            raise ValueError(f"Этап {name} уже добавлен или зависит от неизвестных этапов: {missing}")
+        self.stages[name] = (function, args, tuple(inputs), tuple(depends))
+        return self
+
+    def run(self) -> dict:
+        """Выполнить все этапы. Этапы отправляются в пул в порядке добавления, каждый ждёт свои зависимости,
+        которые уже отправлены раньше, поэтому пул не может заблокироваться. Ошибка этапа пробрасывается из run.
+
+        Returns:
+            dict: Название этапа/результат.
+        """
+        start = time.perf_counter()
+        futures = {}
+
+        def run_stage(name: str):
+            function, args, inputs, depends = self.stages[name]
+            for stage in depends:
+                futures[stage].result()
+            inputs = [futures[stage].result() for stage in inputs]
+            begin = time.perf_counter()
+            result = function(*args, *inputs)
+            self.timings[name] = (begin - start, time.perf_counter() - start)
+            return result
+
+        with ThreadPoolExecutor(max_workers=self.workers or len(self.stages) or 1) as executor:
+            for name in self.stages:
+                futures[name] = executor.submit(run_stage, name)
+            wait(futures.values())
+        self.results = {name: future.result() for name, future in futures.items()}
+        return self.results
+
+    def print_timings(self):
+        """Напечатать время каждого этапа и общее время."""
+        for name in self.stages:
+            begin, end = self.timings[name]
+            print(f"{name}: {end - begin:.2f} с (с {begin:.2f} по {end:.2f} с)")
+        print(f"всего: {max((end for _, end in self.timings.values()), default=0):.2f} с")
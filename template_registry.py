@@ -0,0 +1,35 @@
+import os
+from functools import lru_cache
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+
+
+TEMPLATE_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_CACHE_ENV = "TEMPLATE_CACHE"
+
+
+@lru_cache(maxsize=None)
+def get_environment() -> Environment:
+    """Общее окружение Jinja для всех отчётов. Скомпилированные шаблоны хранятся в памяти окружения,
+    байткод - на диске в папке из переменной окружения TEMPLATE_CACHE (по умолчанию - во временной папке
+    пользователя), поэтому следующий запуск не компилирует шаблоны заново.
+
+    Returns:
+        Environment: Окружение, один объект на процесс.
+    """
+    cache_dir = os.environ.get(TEMPLATE_CACHE_ENV)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    return Environment(loader=FileSystemLoader([".", TEMPLATE_DIR]), bytecode_cache=FileSystemBytecodeCache(cache_dir))
+
+
+def get_template(name: str) -> Template:
+    """Скомпилированный шаблон. Шаблон ищется в текущей папке, затем в папке проекта.
+
+    Args:
+        name (str): Название файла шаблона.
+
+    Returns:
+        Template: Шаблон.
+    """
+    return get_environment().get_template(name)
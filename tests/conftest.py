@@ -0,0 +1,23 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope="session")
+def load_script():
+    """Загрузка пронумерованного скрипта (например, 3.3.3.py), который нельзя импортировать по имени."""
+    def load(name):
+        module_name = "script_" + name.replace(".", "_")
+        if module_name not in sys.modules:
+            spec = importlib.util.spec_from_file_location(module_name, os.path.join(ROOT, name + ".py"))
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            spec.loader.exec_module(module)
+        return sys.modules[module_name]
+    return load
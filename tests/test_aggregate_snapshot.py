@@ -0,0 +1,36 @@
+import os
+
+from aggregate_snapshot import get_snapshot_name, load_snapshot, save_snapshot
+
+
+ROWS = ("name,salary,area_name,published_at\n"
+        "Программист,100000.0,Москва,2022-07-19T11:10:32+0300\n"
+        "Аналитик,80000.0,Казань,2021-01-05T08:00:00+0300\n")
+
+
+def write_file(tmp_path, rows=ROWS):
+    file_name = tmp_path / "vacancies.csv"
+    file_name.write_text(rows, encoding="utf-8")
+    return str(file_name)
+
+
+def test_snapshot_after_append(tmp_path):
+    file_name = write_file(tmp_path)
+    save_snapshot(file_name, "Frontend/Backend", {"count": 2}, os.path.getsize(file_name))
+    with open(file_name, "a", encoding="utf-8") as file:
+        file.write("Тестировщик,60000.0,Омск,2022-01-01T00:00:00+0300\n")
+    assert load_snapshot(file_name, "Frontend/Backend") == ({"count": 2}, len(ROWS.encode()))
+
+
+def test_snapshot_after_edit(tmp_path):
+    rows = ROWS + ROWS.split("\n", 1)[1] * 1000
+    file_name = write_file(tmp_path, rows)
+    save_snapshot(file_name, "Программист", {"count": 2000}, os.path.getsize(file_name))
+    write_file(tmp_path, rows.replace("100000.0", "900000.0", 1))
+    assert load_snapshot(file_name, "Программист") == (None, ROWS.index("\n") + 1)
+
+
+def test_snapshot_name():
+    names = {get_snapshot_name("vacancies.csv", key) for key in ["a/b", "a%2Fb", "a_b", "C:\\a"]}
+    assert len(names) == 4
+    assert all(os.sep not in name and "/" not in name for name in names)
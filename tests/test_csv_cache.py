@@ -0,0 +1,18 @@
+import pandas as pd
+
+from csv_cache import read_vacancies
+
+
+ROWS = ("name,salary,area_name,published_at\n"
+        "Программист,100000.0,Москва,2022-07-19T11:10:32+0300\n"
+        "Аналитик,80000.0,Казань,\n"
+        "Программист,90000.0,Москва,2021-01-05T08:00:00+0300\n")
+
+
+def test_read_vacancies_blank_published_at(tmp_path):
+    file_name = tmp_path / "vacancies.csv"
+    file_name.write_text(ROWS, encoding="utf-8-sig")
+    for _ in range(2):
+        data = read_vacancies(str(file_name))
+        assert pd.isna(data["year"][1])
+        assert data.dropna()["year"].tolist() == [2022, 2021]
@@ -0,0 +1,31 @@
+import csv
+import random
+
+import pytest
+
+import csv_shards
+from csv_shards import read_shard, split_csv
+
+
+def write_rows(file_name, count):
+    generator = random.Random(4)
+    with open(file_name, "w", encoding="utf-8-sig", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["name", "key_skills", "area_name", "published_at"])
+        for i in range(count):
+            skills = "\n".join(f"a{j},b,c,d" for j in range(generator.randint(0, 12)))
+            if i % 2:
+                skills += '\n"quoted", ""c""'
+            writer.writerow([f"Программист {i}", skills, "Москва", f"2022-07-{i % 28 + 1:02}T11:10:32+0300"])
+
+
+@pytest.mark.parametrize("window_size", [97, 1 << 20])
+@pytest.mark.parametrize("parts", [1, 7, 300])
+def test_shards_match_csv_reader(tmp_path, monkeypatch, parts, window_size):
+    monkeypatch.setattr(csv_shards, "WINDOW_SIZE", window_size)
+    file_name = tmp_path / "vacancies.csv"
+    write_rows(file_name, 3000)
+    with open(file_name, encoding="utf-8-sig", newline="") as file:
+        expected = list(csv.reader(file))[1:]
+    rows = [row for start, end in split_csv(str(file_name), parts) for row in read_shard(str(file_name), start, end)]
+    assert rows == expected
@@ -0,0 +1,80 @@
+import csv
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+
+class BankHandler(BaseHTTPRequestHandler):
+    """Заглушка XML_daily.asp: курс USD за день равен номеру дня, первые запросы дат из failures получают 503."""
+    def do_GET(self):
+        date = parse_qs(urlparse(self.path).query)["date_req"][0]
+        self.server.requests[date] += 1
+        if self.server.requests[date] <= self.server.failures.get(date, 0):
+            status, content = 503, b"Service Unavailable"
+        else:
+            day = int(date.split("/")[0])
+            status, content = 200, (
+                f'<?xml version="1.0" encoding="utf-8"?><ValCurs Date="{date}">'
+                f'<Valute><CharCode>USD</CharCode><Nominal>1</Nominal><Value>{day},5</Value></Valute>'
+                f'<Valute><CharCode>KZT</CharCode><Nominal>100</Nominal><Value>17,9</Value></Valute>'
+                f'</ValCurs>').encode()
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def bank():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BankHandler)
+    server.requests, server.failures = Counter(), {}
+    server.url = f"http://127.0.0.1:{server.server_port}/scripts/XML_daily.asp"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_retry_on_server_error(load_script, bank, tmp_path):
+    module = load_script("3.3.1")
+    bank.failures["01/02/2022"] = 2
+    missing = module.get_curency_from_bank((2022, 1), (2022, 3), bank.url, workers=2, cache_dir=str(tmp_path))
+    assert missing == [(2022, 1, 1), (2022, 2, 1), (2022, 3, 1)]
+    assert bank.requests["01/02/2022"] == 3
+    assert all(module.is_cached(module.get_cache_name(*date[:2], str(tmp_path))) for date in missing)
+
+
+def test_skip_cached(load_script, bank, tmp_path):
+    module = load_script("3.3.1")
+    cached = module.get_cache_name(2022, 1, str(tmp_path))
+    with open(cached, "w", encoding="utf-8") as file:
+        file.write('<ValCurs Date="01.01.2022"></ValCurs>\n')
+    with open(module.get_cache_name(2022, 2, str(tmp_path)), "w", encoding="utf-8") as file:
+        file.write('<ValCurs Date="01.02.2022"><Valute>')
+    missing = module.get_curency_from_bank((2022, 1), (2022, 3), bank.url, workers=2, cache_dir=str(tmp_path))
+    assert missing == [(2022, 2, 1), (2022, 3, 1)]
+    assert set(bank.requests) == {"01/02/2022", "01/03/2022"}
+    with open(cached, encoding="utf-8") as file:
+        assert file.read() == '<ValCurs Date="01.01.2022"></ValCurs>\n'
+
+
+def test_daily(load_script, bank, tmp_path):
+    module = load_script("3.3.1")
+    file_name = str(tmp_path / "complite.csv")
+    module.get_curency_from_bank((2022, 2, 27), (2022, 3, 1), bank.url, workers=2, cache_dir=str(tmp_path),
+                                 daily=True)
+    assert set(bank.requests) == {"27/02/2022", "28/02/2022", "01/03/2022"}
+    module.complite_curency_from_bank(["USD", "KZT", "EUR"], (2022, 2, 27), (2022, 3, 1), workers=1, daily=True,
+                                      file_name=file_name, cache_dir=str(tmp_path))
+    with open(file_name, encoding="utf-8") as file:
+        assert list(csv.reader(file)) == [["date", "USD", "KZT", "EUR"],
+                                          ["2022-02-27", "27.5", "0.179", ""],
+                                          ["2022-02-28", "28.5", "0.179", ""],
+                                          ["2022-03-01", "1.5", "0.179", ""]]
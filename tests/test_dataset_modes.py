@@ -0,0 +1,13 @@
+import pytest
+
+
+ROWS = ("name,salary_from,salary_to,salary_currency,area_name,published_at\n"
+        "Программист,100000,120000,RUR,Москва,2022-07-19T11:10:32+0300\n")
+
+
+@pytest.mark.parametrize("script, mode", [("3.2.2", "columnar"), ("3.2.2", "chunk"), ("3.2.3", "chunk")])
+def test_unknown_mode(load_script, tmp_path, script, mode):
+    file_name = tmp_path / "vacancies.csv"
+    file_name.write_text(ROWS, encoding="utf-8-sig")
+    with pytest.raises(ValueError):
+        load_script(script).DataSet(str(tmp_path / "csv"), "Программист", str(file_name), mode)
@@ -0,0 +1,18 @@
+import pytest
+
+from date_parsing import decode_published_at, get_year
+
+
+def test_decode_blank_published_at():
+    year, month, day = decode_published_at(["2022-07-19T11:10:32+0300", float("nan"), "", "2020"])
+    assert year.tolist() == [2022, 0, 0, 2020]
+    assert month.tolist() == [7, 1, 1, 1]
+    assert day.tolist() == [19, 1, 1, 1]
+
+
+def test_get_year_fallback():
+    assert get_year("2022-07-19T11:10:32+0300") == 2022
+    assert get_year("2020") == 2020
+    assert get_year("2019/05/01 10:00") == 2019
+    with pytest.raises(ValueError):
+        get_year("")
@@ -0,0 +1,45 @@
+import os
+import random
+
+import pytest
+
+from name_index import NameIndex
+
+
+ALPHABET = "абвгАБВГ -1С"
+ROWS = ("name,salary,area_name,published_at\n"
+        "Программист,100000.0,Москва,2022-07-19T11:10:32+0300\n"
+        "Аналитик,80000.0,Казань,2021-01-05T08:00:00+0300\n"
+        "Программист 1С,90000.0,Москва,2021-01-05T08:00:00+0300\n")
+
+
+def get_text(generator, size):
+    return "".join(generator.choice(ALPHABET) for _ in range(size))
+
+
+@pytest.mark.parametrize("ignore_case", [False, True])
+def test_find_names_matches_substring_search(ignore_case):
+    generator = random.Random(11)
+    names = sorted({get_text(generator, generator.randint(0, 12)) for _ in range(300)})
+    index = NameIndex(names, [generator.randrange(len(names)) for _ in range(1000)])
+    for _ in range(300):
+        substring = get_text(generator, generator.randint(1, 5))
+        if ignore_case:
+            expected = [i for i, name in enumerate(names) if substring.lower() in name.lower()]
+        else:
+            expected = [i for i, name in enumerate(names) if substring in name]
+        assert index.find_names(substring, ignore_case).tolist() == expected
+        is_found = [i in expected for i in index.name_codes]
+        assert index.get_row_mask(substring, ignore_case).tolist() == is_found
+
+
+def test_load_after_change(tmp_path):
+    file_name = tmp_path / "vacancies.csv"
+    file_name.write_text(ROWS, encoding="utf-8-sig")
+    NameIndex.build(str(file_name)).save(str(file_name))
+    index = NameIndex.load(str(file_name))
+    assert index.find_rows("программист", ignore_case=True).tolist() == [0, 2]
+    stat = os.stat(file_name)
+    file_name.write_text(ROWS.replace("Аналитик", "Аналитиk"), encoding="utf-8-sig")
+    os.utime(file_name, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert NameIndex.load(str(file_name)) is None
@@ -0,0 +1,25 @@
+import pytest
+
+from pdf_backends import PdfBackend
+
+
+class TextBackend(PdfBackend):
+    def write(self, html, pdf_name):
+        with open(pdf_name, "w", encoding="utf-8") as file:
+            file.write(html)
+
+
+def test_backend_without_write():
+    class IncompleteBackend(PdfBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteBackend()
+
+
+def test_write_many(tmp_path):
+    pages = [(f"<p>{i}</p>", str(tmp_path / f"report_{i}.pdf")) for i in range(5)]
+    assert TextBackend(workers=2).write_many(iter(pages)) == [pdf_name for _, pdf_name in pages]
+    for html, pdf_name in pages:
+        with open(pdf_name, encoding="utf-8") as file:
+            assert file.read() == html
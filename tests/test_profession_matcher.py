@@ -0,0 +1,35 @@
+import random
+
+import pytest
+
+from profession_matcher import ProfessionMatcher
+
+
+ALPHABET = "абвАБВ -ab"
+
+
+def get_text(generator, size):
+    return "".join(generator.choice(ALPHABET) for _ in range(size))
+
+
+@pytest.mark.parametrize("ignore_case", [False, True])
+def test_find_matches_substring_search(ignore_case):
+    generator = random.Random(7)
+    for _ in range(50):
+        professions = [get_text(generator, generator.randint(1, 4)) for _ in range(generator.randint(1, 8))]
+        professions.append(professions[0])
+        matcher = ProfessionMatcher(professions, ignore_case)
+        for _ in range(40):
+            name = get_text(generator, generator.randint(0, 20))
+            if ignore_case:
+                expected = tuple(i for i, profession in enumerate(professions) if profession.lower() in name.lower())
+            else:
+                expected = tuple(i for i, profession in enumerate(professions) if profession in name)
+            assert matcher.find(name) == expected
+            assert matcher.find(name) == expected
+
+
+def test_find_names():
+    matcher = ProfessionMatcher(["программист", "Аналитик", "программист 1С"], ignore_case=True)
+    assert matcher.find_names("Ведущий Программист 1С, аналитик") == ["программист", "Аналитик", "программист 1С"]
+    assert matcher.find_names("Менеджер") == []
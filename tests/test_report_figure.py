@@ -0,0 +1,41 @@
+import io
+
+from report_figure import ReportFigure
+
+
+REPORTS = [
+    {"Программист": [120, 130, 90], "Аналитик": [80, 95, 100]},
+    {"Программист": [200, 30, 90], "Аналитик": [80, 95, 100]},
+    {"Программист": [12, 13, 9], "Москва": [80, 95, 100]},
+    {"Программист": [120, 130, 90], "Аналитик": [80, 95, 100]},
+]
+
+
+def draw_years(ax, heights):
+    ax.bar([2020.2, 2021.2, 2022.2], [100, 110, 120], width=0.4)
+    bars = ax.bar([2019.8, 2020.8, 2021.8], heights, width=0.4)
+    ax.tick_params(axis="x", labelrotation=90)
+    return bars
+
+
+def draw_cities(ax, cities):
+    ax.barh(list(cities), [sum(values) for values in cities.values()])
+    ax.tick_params(axis="y", labelsize=6)
+    ax.invert_yaxis()
+
+
+def draw(figure, report):
+    heights = report["Программист"]
+    figure.draw((0, 0), None, heights, draw_years, heights)
+    figure.draw((1, 0), report, None, draw_cities, report)
+    buffer = io.BytesIO()
+    figure.save(buffer, dpi=50, image_format="png", h_pad=2)
+    return buffer.getvalue()
+
+
+def test_batch_matches_single():
+    with ReportFigure((8, 6), pad_font_size=16) as figure:
+        batch = [draw(figure, report) for report in REPORTS]
+    for image, report in zip(batch, REPORTS):
+        with ReportFigure((8, 6), pad_font_size=16) as figure:
+            assert image == draw(figure, report)
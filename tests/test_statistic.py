@@ -0,0 +1,15 @@
+def get_row(name, salary, year):
+    return {"name": name, "area_name": "Москва", "salary_from": salary, "salary_to": salary,
+            "salary_currency": "RUR", "published_at": f"{year}-07-19T11:10:32+0300"}
+
+
+def test_merge_after_handle_information(load_script):
+    module = load_script("2.3.1")
+    statistic = module.Statistic("Программист")
+    statistic.enter_static_data([get_row("Программист", 100, 2021), get_row("Аналитик", 50, 2022)])
+    assert list(statistic.get_salary_dynamic) == [2021, 2022]
+    other = module.Statistic("Программист")
+    other.enter_static_data([get_row("Программист", 80, 2020), get_row("Программист", 120, 2022)])
+    statistic.merge(other)
+    assert statistic.get_salary_dynamic == {2020: 80, 2021: 100, 2022: 85}
+    assert list(statistic.get_selected_vacancies_dynamic.items()) == [(2020, 1), (2021, 1), (2022, 1)]
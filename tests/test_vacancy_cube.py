@@ -0,0 +1,25 @@
+import os
+
+from vacancy_cube import VacancyCube
+
+
+ROWS = ("name,salary,area_name,published_at\n"
+        "Программист,100000.0,Москва,2022-07-19T11:10:32+0300\n"
+        "Аналитик,80000.0,Казань,2021-01-05T08:00:00+0300\n"
+        "Программист 1С,90000.0,Москва,2021-01-05T08:00:00+0300\n")
+
+
+def test_load_after_change(tmp_path):
+    file_name = tmp_path / "vacancies.csv"
+    file_name.write_text(ROWS, encoding="utf-8-sig")
+    VacancyCube.build(str(file_name), ["программист"]).save(str(file_name))
+    cube = VacancyCube.load(str(file_name))
+    assert cube.get_total() == 3
+    assert cube.get_years("Программист", "москва")["count"].to_dict() == {2021: 1, 2022: 1}
+    stat = os.stat(file_name)
+    file_name.write_text(ROWS.replace("80000.0", "70000.0"), encoding="utf-8-sig")
+    os.utime(file_name, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert VacancyCube.load(str(file_name)) is None
+    with open(file_name, "a", encoding="utf-8") as file:
+        file.write("Аналитик,60000.0,Казань,2022-01-05T08:00:00+0300\n")
+    assert VacancyCube.load(str(file_name)) is None
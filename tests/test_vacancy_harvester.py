@@ -0,0 +1,91 @@
+import asyncio
+import csv
+import json
+import os
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
+WINDOWS = [("2022-12-26T00:00:00+0300", "2022-12-26T06:00:00+0300"),
+           ("2022-12-26T06:00:00+0300", "2022-12-26T12:00:00+0300")]
+
+
+class VacanciesHandler(BaseHTTPRequestHandler):
+    """Мок /vacancies: две страницы на окно, в названиях вакансий есть слово captcha."""
+    def do_GET(self):
+        params = {key: value[0] for key, value in parse_qs(urlparse(self.path).query).items()}
+        self.server.requests.append((params["date_from"], int(params["page"])))
+        if params["date_from"] in self.server.captcha:
+            status, body = 403, {"errors": [{"type": "captcha_required"}]}
+        else:
+            items = [{"name": f"captcha {params['date_from']} {params['page']}", "salary": None,
+                      "area": {"name": "Москва"}, "published_at": params["date_from"]}]
+            status, body = 200, {"found": 150, "pages": 2, "items": items}
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), VacanciesHandler)
+    server.requests, server.captcha = [], set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def get_windows():
+    return [(datetime.strptime(date_from, TIME_FORMAT), datetime.strptime(date_to, TIME_FORMAT))
+            for date_from, date_to in WINDOWS]
+
+
+def harvest(harvester_module, api, file_name):
+    harvester = harvester_module.VacancyHarvester(str(file_name), url=f"http://127.0.0.1:{api.server_port}",
+                                                  rate=1000, workers=2, flatten_workers=1)
+    asyncio.run(harvester.harvest(get_windows()))
+    return harvester
+
+
+def read_names(file_name):
+    with open(file_name, encoding="utf-8") as file:
+        return sorted(row[0] for row in list(csv.reader(file))[1:])
+
+
+def test_captcha_in_vacancy_name(load_script, api, tmp_path):
+    harvester = harvest(load_script("3.3.3"), api, tmp_path / "vacancies.csv")
+    assert read_names(tmp_path / "vacancies.csv") == sorted(f"captcha {date_from} {page}"
+                                                             for date_from, _ in WINDOWS for page in range(2))
+    assert not os.path.exists(harvester.checkpoint_name)
+
+
+def test_captcha_response(load_script, api, tmp_path):
+    api.captcha.add(WINDOWS[1][0])
+    with pytest.raises(RuntimeError):
+        harvest(load_script("3.3.3"), api, tmp_path / "vacancies.csv")
+
+
+def test_resume_from_checkpoint(load_script, api, tmp_path):
+    file_name = tmp_path / "vacancies.csv"
+    with open(file_name, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(load_script("3.3.3").title)
+        writer.writerows([f"captcha {WINDOWS[0][0]} {page}"] for page in range(2))
+    with open(f"{file_name}.checkpoint.json", "w", encoding="utf-8") as file:
+        json.dump({"file": str(file_name), "done": ["/".join(WINDOWS[0])]}, file)
+    harvest(load_script("3.3.3"), api, file_name)
+    assert {date_from for date_from, _ in api.requests} == {WINDOWS[1][0]}
+    assert len(read_names(file_name)) == 4
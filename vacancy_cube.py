@@ -0,0 +1,163 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from csv_cache import get_key, read_vacancies
+from profession_matcher import ProfessionMatcher
+
+
+ALL_PROFESSIONS = -1
+
+
+def get_cube_name(file_name: str) -> str:
+    """Название файла куба для csv-файла.
+
+    Args:
+        file_name (str): Название csv-файла с вакансиями.
+
+    Returns:
+        str: Название файла куба.
+    """
+    return f"{file_name}.cube.npz"
+
+
+class VacancyCube:
+    """Разреженный куб (год, город, профессия) -> (количество вакансий, сумма зарплат).
+    Профессия ALL_PROFESSIONS - все вакансии, остальные - индексы в professions; вакансия относится ко всем
+    профессиям, названия которых входят в её название без учёта регистра.
+
+    Attributes:
+        areas (np.ndarray): Названия городов, город в ячейке - индекс в этом массиве.
+        professions (list): Профессии куба.
+        cells (pd.DataFrame): Ячейки: year, area, profession, count, salary_sum.
+    """
+    def __init__(self, areas: np.ndarray, professions: list, cells: pd.DataFrame):
+        """Инициализация объекта VacancyCube.
+
+        Args:
+            areas (np.ndarray): Названия городов.
+            professions (list): Профессии куба.
+            cells (pd.DataFrame): Ячейки куба.
+        """
+        self.areas = np.asarray(areas, dtype=str)
+        self.professions = list(professions)
+        self.cells = cells
+        self.__profession_index = {profession.lower(): i for i, profession in enumerate(self.professions)}
+        self.__lower_areas = np.char.lower(self.areas)
+
+    @classmethod
+    def build(cls, file_name: str, professions: list):
+        """Построить куб по csv-файлу одним проходом: названия вакансий проверяются по уникальным значениям.
+
+        Args:
+            file_name (str): Название csv-файла с вакансиями.
+            professions (list): Профессии куба.
+
+        Returns:
+            VacancyCube: Куб.
+        """
+        data = read_vacancies(file_name).dropna()
+        names = data["name"].astype("category")
+        matcher = ProfessionMatcher(professions, ignore_case=True)
+        matches = pd.Series([matcher.find(name) + (ALL_PROFESSIONS,) for name in names.cat.categories])
+        cells = pd.DataFrame({"year": data["year"].to_numpy(),
+                              "area": data["area_name"].cat.codes.to_numpy(),
+                              "profession": matches[names.cat.codes].to_numpy(),
+                              "salary": data["salary"].to_numpy()})\
+            .explode("profession")\
+            .groupby(["year", "area", "profession"])["salary"]\
+            .agg(count="count", salary_sum="sum")\
+            .reset_index()\
+            .astype({"year": np.int16, "area": np.int32, "profession": np.int16, "count": np.int64,
+                     "salary_sum": np.float64})
+        return cls(data["area_name"].cat.categories.to_numpy(dtype=str), professions, cells)
+
+    def save(self, file_name: str):
+        """Сохранить куб рядом с csv-файлом вместе с ключом csv-файла.
+
+        Args:
+            file_name (str): Название csv-файла, по которому построен куб.
+        """
+        cube_name = get_cube_name(file_name)
+        with open(cube_name + ".tmp", "wb") as file:
+            np.savez_compressed(file, areas=self.areas, professions=np.array(self.professions, dtype=str),
+                                key=np.array(json.dumps(get_key(file_name))),
+                                **{column: self.cells[column].to_numpy() for column in self.cells})
+        os.replace(cube_name + ".tmp", cube_name)
+
+    @classmethod
+    def load(cls, file_name: str):
+        """Загрузить куб csv-файла.
+
+        Args:
+            file_name (str): Название csv-файла с вакансиями.
+
+        Returns:
+            VacancyCube: Куб или None, если куба нет или csv-файл изменился после его построения.
+        """
+        cube_name = get_cube_name(file_name)
+        if not os.path.exists(cube_name):
+            return None
+        with np.load(cube_name) as cube:
+            if json.loads(str(cube["key"])) != get_key(file_name):
+                return None
+            cells = pd.DataFrame({column: cube[column]
+                                  for column in ("year", "area", "profession", "count", "salary_sum")})
+            return cls(cube["areas"], cube["professions"].tolist(), cells)
+
+    def has_profession(self, profession: str) -> bool:
+        """Проверить, что на запрос по профессии можно ответить по кубу.
+
+        Args:
+            profession (str): Название профессии.
+
+        Returns:
+            bool: True, если профессия есть в кубе.
+        """
+        return profession.lower() in self.__profession_index
+
+    def get_total(self) -> int:
+        """Количество всех вакансий.
+
+        Returns:
+            int: Количество вакансий.
+        """
+        return int(self.cells.loc[self.cells["profession"] == ALL_PROFESSIONS, "count"].sum())
+
+    def get_years(self, profession: str = None, area_name: str = None) -> pd.DataFrame:
+        """Средняя зарплата и количество вакансий по годам.
+
+        Args:
+            profession (str): Профессия куба, None - все вакансии.
+            area_name (str): Город без учёта регистра, None - все города.
+
+        Returns:
+            pd.DataFrame: Столбцы mean и count, индекс - год; годы без вакансий пропущены.
+        """
+        index = ALL_PROFESSIONS if profession is None else self.__profession_index[profession.lower()]
+        mask = self.cells["profession"] == index
+        if area_name is not None:
+            mask &= np.isin(self.cells["area"], np.flatnonzero(self.__lower_areas == area_name.lower()))
+        by_year = self.cells[mask].groupby("year")[["count", "salary_sum"]].sum()
+        by_year = by_year[by_year["count"] > 0]
+        return pd.DataFrame({"mean": by_year["salary_sum"] / by_year["count"], "count": by_year["count"]})
+
+    def get_areas(self) -> pd.DataFrame:
+        """Количество вакансий и средняя зарплата по городам.
+
+        Returns:
+            pd.DataFrame: Столбцы count и mean, индекс - название города; города без вакансий пропущены.
+        """
+        by_area = self.cells[self.cells["profession"] == ALL_PROFESSIONS].groupby("area")[["count", "salary_sum"]].sum()
+        return pd.DataFrame({"count": by_area["count"].to_numpy(),
+                             "mean": (by_area["salary_sum"] / by_area["count"]).to_numpy()},
+                            index=pd.Index(self.areas[by_area.index], name="area_name"))
+
+
+if __name__ == '__main__':
+    file_name = input()
+    professions = input().split(',')
+
+    VacancyCube.build(file_name, [profession.strip() for profession in professions]).save(file_name)